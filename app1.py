@@ -1005,14 +1005,13 @@ class SwiggyApp(ctk.CTk):
             return
 
         try:
-            results = self.db_connection.fetch_query_result(query)
-            cursor_description = self.db_connection.cursor.description
+            columns, results = self.db_connection.fetch_query_result(query, with_columns=True)
 
             if not results:
                 messagebox.showinfo("Query Result", "No data returned.")
                 return
 
-            columns = [desc[0] for desc in cursor_description] if cursor_description else [f"Column {i+1}" for i in range(len(results[0]))]
+            columns = columns or [f"Column {i+1}" for i in range(len(results[0]))]
 
             self.latest_query_results = results
             self.latest_query_columns = columns
@@ -0,0 +1,377 @@
+import numbers
+import threading
+import time
+import numpy as np
+from db.dimension_cache import DIMENSIONS_BY_TABLE, natural_key
+
+# Integer columns of fact_swiggy held in memory; the *_id columns double as dictionary codes of their dimension
+FACT_COLUMNS = (
+    "fact_id", "city_id", "locality_id", "rest_id", "cuisine_id", "rating_id", "delivery_id", "booking_id",
+    "avg_cost_for_two", "votes", "price_range",
+)
+
+# Rows fetched per round-trip while loading facts
+ANALYTICS_BATCH_SIZE = 50000
+
+# Short names accepted wherever a dimension table is expected
+DIMENSION_ALIASES = {
+    "restaurant": "restaurants", "cuisine": "cuisines", "rating": "ratings",
+    "has_online_delivery": "delivery", "has_table_booking": "booking",
+}
+
+# Comparison operators of filters given as (op, value)
+_OPERATORS = {
+    "=": np.equal, "==": np.equal, "!=": np.not_equal, "<": np.less, "<=": np.less_equal, ">": np.greater,
+    ">=": np.greater_equal,
+}
+
+AGGREGATES = ("count", "sum", "mean", "min", "max")
+
+
+# One dimension as arrays indexed by surrogate id: the attribute values of every member (None for unused ids)
+class _DimensionArrays:
+    def __init__(self, dimension, rows):
+        self.dimension = dimension
+        size = max((row[0] for row in rows), default=0) + 1
+        self.attributes = {column: np.full(size, None, dtype=object) for column in dimension.key_columns}
+        # natural key -> lowest id, to turn label filters into integer comparisons
+        self.codes = {}
+        self._numeric = {}
+        self._value_codes = {}
+        self._is_numeric = {}
+        for member_id, *values in rows:
+            for column, value in zip(dimension.key_columns, values):
+                self.attributes[column][member_id] = value
+            self.codes.setdefault(natural_key(values), member_id)
+
+    @property
+    def size(self):
+        return len(next(iter(self.attributes.values())))
+
+    def label(self, member_id):
+        values = tuple(self.attributes[column][member_id] for column in self.dimension.key_columns)
+        return values[0] if len(values) == 1 else values
+
+    def is_numeric(self, column):
+        if column not in self._is_numeric:
+            self._is_numeric[column] = all(value is None or isinstance(value, numbers.Number) for value in self.attributes[column])
+        return self._is_numeric[column]
+
+    # Text attribute (e.g. ratings.text) as one dense code per distinct value, indexed by id (-1 where unused),
+    # and the value of every code
+    def value_codes(self, column):
+        if column not in self._value_codes:
+            values = self.attributes[column]
+            labels = sorted({value for value in values if value is not None})
+            index = {value: code for code, value in enumerate(labels)}
+            codes = np.array([-1 if value is None else index[value] for value in values], dtype=np.int64)
+            self._value_codes[column] = (codes, labels)
+        return self._value_codes[column]
+
+    # Attribute as a numeric array (e.g. ratings.star), NaN where the id is unused
+    def numeric(self, column):
+        if column not in self._numeric:
+            values = self.attributes[column]
+            self._numeric[column] = np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+        return self._numeric[column]
+
+
+# Immutable view of the loaded data; queries work on the snapshot current when they start, refreshes swap it
+class _Snapshot:
+    def __init__(self, facts, dimensions, watermark):
+        self.facts = facts
+        self.dimensions = dimensions
+        self.watermark = watermark
+        self.rows = len(facts["fact_id"])
+
+
+def _empty_facts():
+    return {column: np.empty(0, dtype=np.int64) for column in FACT_COLUMNS}
+
+
+# In-process columnar copy of fact_swiggy and its dimensions for dashboard aggregates.
+# Facts are loaded once into one NumPy array per column; dimensions become arrays indexed by surrogate id, so the
+# fact foreign keys are already dictionary codes and group-bys are np.bincount over them. The engine listens to the
+# writes SwiggyDBConnection reports: after a write to fact_swiggy or a dimension the next query first refreshes,
+# appending only facts above the fact_id watermark (a full reload happens when rows were deleted).
+#
+# Columns are addressed by name: fact measures (avg_cost_for_two, votes, price_range, ...), a dimension table or
+# alias for its members (city, locality, restaurant, cuisine, rating, delivery, booking) and `table.column` for a
+# dimension attribute (ratings.star, ratings.text). Text attributes can be grouped on and filtered (on codes of
+# their distinct values, case-insensitively for equality) but not aggregated.
+class AnalyticsEngine:
+    def __init__(self, db, batch_size=ANALYTICS_BATCH_SIZE, auto_refresh=True):
+        self.db = db
+        self.batch_size = batch_size
+        self.auto_refresh = auto_refresh
+        self._snapshot = None
+        self._stale_facts = True
+        self._stale_dimensions = set(DIMENSIONS_BY_TABLE)
+        # _state_lock guards the stale flags only, so writers reporting changes never wait for a refresh in progress
+        self._state_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.last_refresh = None
+        db.add_write_listener(self._on_write)
+
+    def close(self):
+        self.db.remove_write_listener(self._on_write)
+
+    # Called by SwiggyDBConnection with the tables a statement wrote (None when unknown)
+    def _on_write(self, tables):
+        with self._state_lock:
+            if not tables:
+                self._stale_facts = True
+                self._stale_dimensions = set(DIMENSIONS_BY_TABLE)
+                return
+            if "fact_swiggy" in tables:
+                self._stale_facts = True
+            self._stale_dimensions |= set(tables) & DIMENSIONS_BY_TABLE.keys()
+
+    def is_stale(self):
+        with self._state_lock:
+            return self._snapshot is None or self._stale_facts or bool(self._stale_dimensions)
+
+    # Bring the arrays up to date; full=True reloads everything. Returns what was done.
+    def refresh(self, full=False):
+        with self._refresh_lock:
+            start = time.perf_counter()
+            previous = self._snapshot
+            # Take the flags up front: writes reported while this refresh runs mark the engine stale again
+            with self._state_lock:
+                stale_facts, self._stale_facts = self._stale_facts, False
+                stale_dimensions, self._stale_dimensions = self._stale_dimensions, set()
+            if full or previous is None:
+                stale_dimensions = set(DIMENSIONS_BY_TABLE)
+            reload_facts = full or previous is None
+            try:
+                dimensions = dict(previous.dimensions) if previous else {}
+                for table in stale_dimensions:
+                    dimensions[table] = self._load_dimension(DIMENSIONS_BY_TABLE[table])
+                appended = 0
+                if reload_facts:
+                    facts, watermark = self._load_facts(0)
+                elif stale_facts:
+                    new_facts, watermark = self._load_facts(previous.watermark)
+                    appended = len(new_facts["fact_id"])
+                    facts = {column: np.concatenate((previous.facts[column], new_facts[column])) for column in FACT_COLUMNS}
+                    watermark = max(watermark, previous.watermark)
+                    # Deleted facts leave the count short of what the watermark scan accounts for
+                    if self._count_facts() != len(facts["fact_id"]):
+                        facts, watermark = self._load_facts(0)
+                        reload_facts = True
+                else:
+                    facts, watermark = previous.facts, previous.watermark
+            except Exception:
+                # The DB layer already reported the error; keep the flags so the next query retries
+                with self._state_lock:
+                    self._stale_facts |= stale_facts
+                    self._stale_dimensions |= stale_dimensions
+                raise
+            self._snapshot = _Snapshot(facts, dimensions, watermark)
+            elapsed = time.perf_counter() - start
+            self.last_refresh = {
+                "rows": self._snapshot.rows, "appended": appended, "full_reload": reload_facts,
+                "dimensions": sorted(stale_dimensions), "seconds": elapsed,
+            }
+            return self.last_refresh
+
+    def _load_dimension(self, dimension):
+        rows = self.db.fetch_query_result(f"SELECT id, {', '.join(dimension.key_columns)} FROM {dimension.table} ORDER BY id")
+        return _DimensionArrays(dimension, rows)
+
+    def _count_facts(self):
+        return int(self.db.fetch_query_result("SELECT COUNT(*) FROM fact_swiggy")[0][0])
+
+    # Facts with fact_id above `watermark` as one int64 array per column, plus the highest fact_id seen
+    def _load_facts(self, watermark):
+        query = f"SELECT {', '.join(FACT_COLUMNS)} FROM fact_swiggy WHERE fact_id > %s ORDER BY fact_id"
+        chunks = []
+        with self.db.iter_query_result(query, params=(watermark,), batch_size=self.batch_size) as stream:
+            for batch in stream.batches():
+                chunks.append(np.array(batch, dtype=np.int64).reshape(-1, len(FACT_COLUMNS)))
+        if not chunks:
+            return _empty_facts(), watermark
+        matrix = np.concatenate(chunks) if len(chunks) > 1 else chunks[0]
+        facts = {column: np.ascontiguousarray(matrix[:, index]) for index, column in enumerate(FACT_COLUMNS)}
+        return facts, int(facts["fact_id"][-1])
+
+    def _current(self):
+        if self._snapshot is None or (self.auto_refresh and self.is_stale()):
+            self.refresh()
+        return self._snapshot
+
+    @property
+    def row_count(self):
+        return self._current().rows
+
+    # Members of a dimension in id order, e.g. for filter drop-downs
+    def members(self, dimension):
+        arrays = self._current().dimensions[self._dimension_name(dimension)]
+        return [arrays.label(member_id) for member_id in range(arrays.size) if arrays.attributes[arrays.dimension.key_columns[0]][member_id] is not None]
+
+    @staticmethod
+    def _dimension_name(name):
+        table = DIMENSION_ALIASES.get(name, name)
+        if table not in DIMENSIONS_BY_TABLE:
+            raise ValueError(f"Unknown dimension '{name}'")
+        return table
+
+    # Array for a column name (see the class comment), aligned with the fact rows of the snapshot
+    def _column(self, snapshot, name):
+        if name in snapshot.facts:
+            return snapshot.facts[name]
+        table, _, attribute = name.partition(".")
+        table = DIMENSION_ALIASES.get(table, table)
+        if table in DIMENSIONS_BY_TABLE:
+            dimension = DIMENSIONS_BY_TABLE[table]
+            codes = snapshot.facts[dimension.fact_column]
+            if not attribute:
+                return codes
+            if attribute not in dimension.key_columns:
+                raise ValueError(f"Unknown column '{name}'")
+            arrays = snapshot.dimensions[table]
+            if not arrays.is_numeric(attribute):
+                return arrays.attributes[attribute][codes]
+            return arrays.numeric(attribute)[codes]
+        raise ValueError(f"Unknown column '{name}'")
+
+    # Per-row value codes and their values for a text dimension attribute (see value_codes); None for other columns
+    def _text_codes(self, snapshot, name):
+        table, _, attribute = name.partition(".")
+        table = DIMENSION_ALIASES.get(table, table)
+        if not attribute or table not in DIMENSIONS_BY_TABLE or attribute not in DIMENSIONS_BY_TABLE[table].key_columns:
+            return None
+        arrays = snapshot.dimensions[table]
+        if arrays.is_numeric(attribute):
+            return None
+        codes, labels = arrays.value_codes(attribute)
+        return codes[snapshot.facts[DIMENSIONS_BY_TABLE[table].fact_column]], labels
+
+    # Numeric array for a measure or histogram column; text attributes cannot be aggregated
+    def _measure(self, snapshot, name, mask):
+        column = self._column(snapshot, name)
+        if column.dtype == object:
+            raise ValueError(f"Column '{name}' is not numeric")
+        return column[mask].astype(np.float64)
+
+    # Boolean row mask for `where`: {column: value, column: [values], column: (op, value)}. Dimension members are
+    # matched by natural value (case-insensitively, like MySQL), so the comparison runs on integer codes.
+    def _mask(self, snapshot, where):
+        mask = np.ones(snapshot.rows, dtype=bool)
+        for name, condition in (where or {}).items():
+            table = DIMENSION_ALIASES.get(name, name)
+            if table in DIMENSIONS_BY_TABLE and "." not in name:
+                values = condition if isinstance(condition, (list, set, frozenset)) else [condition]
+                arrays = snapshot.dimensions[table]
+                codes = [arrays.codes.get(natural_key(value if isinstance(value, tuple) else (value,))) for value in values]
+                codes = [code for code in codes if code is not None]
+                mask &= np.isin(self._column(snapshot, name), codes)
+                continue
+            text = self._text_codes(snapshot, name)
+            if text is not None and not (isinstance(condition, tuple) and len(condition) == 2 and condition[0] in _OPERATORS):
+                # Text attributes are matched case-insensitively too, on their value codes
+                values = condition if isinstance(condition, (list, set, frozenset)) else [condition]
+                wanted = {str(value).casefold() for value in values}
+                row_codes, labels = text
+                mask &= np.isin(row_codes, [code for code, label in enumerate(labels) if str(label).casefold() in wanted])
+                continue
+            column = self._column(snapshot, name)
+            if isinstance(condition, tuple) and len(condition) == 2 and condition[0] in _OPERATORS:
+                mask &= _OPERATORS[condition[0]](column, condition[1])
+            elif isinstance(condition, (list, set, frozenset)):
+                mask &= np.isin(column, list(condition))
+            else:
+                mask &= column == condition
+        return mask
+
+    # Dense group codes for one or more dimension/fact columns, with a function turning a code back into a label
+    def _groups(self, snapshot, by, mask):
+        names = [by] if isinstance(by, str) else list(by)
+        parts, labelers, sizes = [], [], []
+        for name in names:
+            table = DIMENSION_ALIASES.get(name, name)
+            text = self._text_codes(snapshot, name)
+            if text is not None:
+                row_codes, labels = text
+                parts.append(row_codes[mask])
+                sizes.append(max(len(labels), 1))
+                labelers.append(labels.__getitem__)
+                continue
+            values = self._column(snapshot, name)[mask]
+            if table in DIMENSIONS_BY_TABLE and "." not in name:
+                arrays = snapshot.dimensions[table]
+                parts.append(values)
+                sizes.append(max(arrays.size, int(values.max()) + 1 if len(values) else 0))
+                labelers.append(arrays.label)
+            else:
+                uniques, inverse = np.unique(values, return_inverse=True)
+                parts.append(inverse)
+                sizes.append(max(len(uniques), 1))
+                labelers.append(lambda code, uniques=uniques: uniques[code].item())
+        codes = np.ravel_multi_index(parts, sizes) if len(parts) > 1 else parts[0]
+
+        def label(code):
+            if len(parts) == 1:
+                return labelers[0](int(code))
+            return tuple(labeler(int(index)) for labeler, index in zip(labelers, np.unravel_index(code, sizes)))
+
+        return codes, int(np.prod(sizes)), label
+
+    # Aggregate `measure` per group of `by`: [(group, value, rows), ...] in group order. agg is one of AGGREGATES;
+    # "count" needs no measure. Groups without rows are left out.
+    def group_by(self, by, measure=None, agg="mean", where=None):
+        if agg not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{agg}' (expected one of: {', '.join(AGGREGATES)})")
+        snapshot = self._current()
+        mask = self._mask(snapshot, where)
+        codes, size, label = self._groups(snapshot, by, mask)
+        counts = np.bincount(codes, minlength=size)
+        present = np.flatnonzero(counts)
+        values = self._aggregate(snapshot, codes, size, counts, measure, agg, mask)
+        return [(label(code), values[code].item(), int(counts[code])) for code in present]
+
+    def _aggregate(self, snapshot, codes, size, counts, measure, agg, mask):
+        if agg == "count":
+            return counts
+        values = self._measure(snapshot, measure, mask)
+        if agg in ("sum", "mean"):
+            sums = np.bincount(codes, weights=values, minlength=size)
+            if agg == "sum":
+                return sums
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return sums / counts
+        result = np.full(size, np.inf if agg == "min" else -np.inf)
+        (np.minimum if agg == "min" else np.maximum).at(result, codes, values)
+        return result
+
+    # The k groups with the highest (or lowest, ascending=True) aggregate: [(group, value, rows), ...]
+    def top_k(self, by, measure=None, k=10, agg="sum", where=None, ascending=False):
+        groups = self.group_by(by, measure, agg, where)
+        if not groups:
+            return []
+        values = np.array([value for _, value, _ in groups], dtype=np.float64)
+        keys = values if ascending else -values
+        k = min(k, len(groups))
+        selected = np.argpartition(keys, k - 1)[:k]
+        selected = selected[np.argsort(keys[selected], kind="stable")]
+        return [groups[index] for index in selected]
+
+    # Histogram of `measure`: bins is a count (over `value_range` or the data's range) or a list of edges.
+    # Returns (edges, counts); with `by`, counts is {group: counts} over shared edges.
+    def histogram(self, measure, bins=10, by=None, where=None, value_range=None):
+        snapshot = self._current()
+        mask = self._mask(snapshot, where)
+        values = self._measure(snapshot, measure, mask)
+        valid = ~np.isnan(values)
+        edges = np.histogram_bin_edges(values[valid], bins=bins, range=value_range)
+        if by is None:
+            counts, _ = np.histogram(values[valid], bins=edges)
+            return edges.tolist(), counts.tolist()
+        codes, size, label = self._groups(snapshot, by, mask)
+        codes, values = codes[valid], values[valid]
+        # Bin index per row; the last bin is closed on the right like np.histogram
+        bin_index = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, len(edges) - 2)
+        inside = (values >= edges[0]) & (values <= edges[-1])
+        nbins = len(edges) - 1
+        table = np.bincount(codes[inside] * nbins + bin_index[inside], minlength=size * nbins).reshape(size, nbins)
+        return edges.tolist(), {label(code): table[code].tolist() for code in np.flatnonzero(table.sum(axis=1))}
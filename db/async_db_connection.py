@@ -0,0 +1,218 @@
+import asyncio
+import functools
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from db.db_connection import SwiggyDBConnection, DEFAULT_CHUNK_SIZE
+from db.parallel_ingest import DEFAULT_LOADERS, DEFAULT_RANGE_BYTES
+from db.row_stream import DEFAULT_FETCH_BATCH_SIZE
+
+# Source of unique tags for reads that are killed on the server when their coroutine is cancelled
+_call_ids = itertools.count(1)
+
+
+# asyncio counterpart of SwiggyDBConnection for services that run an event loop.
+# Every call runs the blocking SwiggyDBConnection method on a private thread pool sized to the connection pool, so
+# at most pool_size calls hold a thread at a time and the event loop never blocks; other coroutines simply wait
+# for a free worker. Cancelling a coroutine awaiting a read also stops the statement on the server (KILL QUERY).
+# Create it with `await AsyncSwiggyDBConnection.connect(host, user, password, database, ...)`, or wrap an existing
+# SwiggyDBConnection, and `await close()` when done.
+class AsyncSwiggyDBConnection:
+    def __init__(self, db, max_workers=None):
+        self.db = db
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or db.pool_size, thread_name_prefix="swiggy-async-db")
+
+    @classmethod
+    async def connect(cls, host, user, password, database, max_workers=None, **kwargs):
+        loop = asyncio.get_running_loop()
+        db = await loop.run_in_executor(None, functools.partial(SwiggyDBConnection, host, user, password, database, **kwargs))
+        return cls(db, max_workers=max_workers)
+
+    async def close(self):
+        await self._run(self.db.disconnect)
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    # Run a read under a unique tag so that cancelling the awaiting coroutine kills the statement on the server
+    # instead of leaving it running in the worker thread
+    async def _run_cancellable(self, func, *args, **kwargs):
+        tag = kwargs.get("tag") or f"async-{next(_call_ids)}"
+        kwargs["tag"] = tag
+        try:
+            return await self._run(func, *args, **kwargs)
+        except asyncio.CancelledError:
+            # Not awaited through the (busy) worker pool: the cancel opens its own connection
+            await asyncio.get_running_loop().run_in_executor(None, self.db.cancel_query, tag)
+            raise
+
+    async def fetch_table_names(self):
+        return await self._run(self.db.fetch_table_names)
+
+    async def fetch_table_columns(self, table_name):
+        return await self._run(self.db.fetch_table_columns, table_name)
+
+    async def fetch_table_description(self, table_name):
+        return await self._run(self.db.fetch_table_description, table_name)
+
+    async def fetch_table_data(self, table_name, columns=None, where_clause=None, group_by=None, having=None, order_by=None, limit=None, offset=None, timeout=None, tag=None):
+        return await self._run_cancellable(
+            self.db.fetch_table_data, table_name, columns, where_clause, group_by, having, order_by, limit, offset,
+            timeout=timeout, tag=tag
+        )
+
+    async def fetch_query_result(self, query, with_columns=False, params=None, timeout=None, tag=None):
+        return await self._run_cancellable(self.db.fetch_query_result, query, with_columns, params, timeout=timeout, tag=tag)
+
+    async def cancel_query(self, tag):
+        return await self._run(self.db.cancel_query, tag)
+
+    # Streaming reads: returns an AsyncRowStream, use it as
+    #   async with db.iter_query_result(query) as stream:
+    #       async for row in stream: ...
+    def iter_table_data(self, table_name, columns=None, where_clause=None, group_by=None, having=None, order_by=None, limit=None, offset=None, batch_size=DEFAULT_FETCH_BATCH_SIZE, timeout=None):
+        return AsyncRowStream(self, functools.partial(
+            self.db.iter_table_data, table_name, columns, where_clause, group_by, having, order_by, limit, offset,
+            batch_size=batch_size, timeout=timeout
+        ))
+
+    def iter_query_result(self, query, params=None, batch_size=DEFAULT_FETCH_BATCH_SIZE, timeout=None):
+        return AsyncRowStream(self, functools.partial(
+            self.db.iter_query_result, query, params, batch_size=batch_size, timeout=timeout
+        ))
+
+    async def create_tables(self, defer_indexes=False):
+        return await self._run(self.db.create_tables, defer_indexes)
+
+    async def create_indexes(self, tables=None):
+        return await self._run(self.db.create_indexes, tables)
+
+    async def load_from_csv(self, csv_file_path, chunk_size=DEFAULT_CHUNK_SIZE, use_local_infile=False, validate=True):
+        return await self._run(self.db.load_from_csv, csv_file_path, chunk_size, use_local_infile, validate=validate)
+
+    # The parse workers and loader threads are started from one worker thread of this connection
+    async def load_from_csv_parallel(self, csv_file_paths, workers=None, loaders=DEFAULT_LOADERS, chunk_size=DEFAULT_CHUNK_SIZE,
+                                     range_bytes=DEFAULT_RANGE_BYTES, validate=True):
+        return await self._run(self.db.load_from_csv_parallel, csv_file_paths, workers=workers, loaders=loaders,
+                               chunk_size=chunk_size, range_bytes=range_bytes, validate=validate)
+
+    async def load_dictionary_encoded(self, csv_file_path, chunk_size=DEFAULT_CHUNK_SIZE, validate=True):
+        return await self._run(self.db.load_dictionary_encoded, csv_file_path, chunk_size, validate=validate)
+
+    async def initialize_database(self, chunk_size=DEFAULT_CHUNK_SIZE, use_local_infile=False, defer_indexes=False, parallel=False,
+                                  dictionary_encoding=False):
+        return await self._run(self.db.initialize_database, chunk_size, use_local_infile, defer_indexes, parallel,
+                               dictionary_encoding=dictionary_encoding)
+
+    async def reinitialize_database(self, chunk_size=DEFAULT_CHUNK_SIZE, use_local_infile=False, defer_indexes=False, parallel=False,
+                                    dictionary_encoding=False):
+        return await self._run(self.db.reinitialize_database, chunk_size, use_local_infile, defer_indexes, parallel,
+                               dictionary_encoding=dictionary_encoding)
+
+    async def initialize_other_tables(self, parallel=False):
+        return await self._run(self.db.initialize_other_tables, parallel)
+
+    async def drop_tables(self):
+        return await self._run(self.db.drop_tables)
+
+    async def insert_into_restaurants_table(self, name):
+        return await self._run(self.db.insert_into_restaurants_table, name)
+
+    async def insert_into_city_table(self, name):
+        return await self._run(self.db.insert_into_city_table, name)
+
+    async def insert_into_ratings_table(self, star, text):
+        return await self._run(self.db.insert_into_ratings_table, star, text)
+
+    async def insert_into_cuisines_table(self, name):
+        return await self._run(self.db.insert_into_cuisines_table, name)
+
+    async def insert_into_locality_table(self, name):
+        return await self._run(self.db.insert_into_locality_table, name)
+
+    async def insert_into_fact_swiggy_table(self, avg_cost_for_two, votes, price_range, city_id=None, locality_id=None, rest_id=None, cuisine_id=None, rating_id=None, delivery_id=None, booking_id=None, city=None, locality=None, restaurant_name=None, cuisines=None, rating_stars_out_of_5=None, rating_in_text=None, has_online_delivery=None, has_table_booking=None):
+        return await self._run(
+            self.db.insert_into_fact_swiggy_table, avg_cost_for_two, votes, price_range, city_id=city_id,
+            locality_id=locality_id, rest_id=rest_id, cuisine_id=cuisine_id, rating_id=rating_id, delivery_id=delivery_id,
+            booking_id=booking_id, city=city, locality=locality, restaurant_name=restaurant_name, cuisines=cuisines,
+            rating_stars_out_of_5=rating_stars_out_of_5, rating_in_text=rating_in_text,
+            has_online_delivery=has_online_delivery, has_table_booking=has_table_booking
+        )
+
+    # `rows` is a regular iterable; it is consumed on the worker thread
+    async def insert_many_into_fact_swiggy(self, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+        return await self._run(self.db.insert_many_into_fact_swiggy, rows, chunk_size)
+
+    async def ingest_delta(self, csv_file_path, chunk_size=DEFAULT_CHUNK_SIZE, prune=True, validate=True):
+        return await self._run(self.db.ingest_delta, csv_file_path, chunk_size, prune, validate=validate)
+
+
+# Async iterator over a RowStream. The query is started on first use (async with / async for), each batch is
+# fetched on a worker thread and rows are then handed out from memory, so only one batch is held at a time.
+# batches() yields lists of rows instead. Closing the stream early releases its connection.
+class AsyncRowStream:
+    def __init__(self, connection, open_stream):
+        self._connection = connection
+        self._open_stream = open_stream
+        self._stream = None
+        self._batches = None
+        self._buffer = []
+        self._position = 0
+        self.columns = []
+
+    async def _ensure_open(self):
+        if self._stream is None:
+            self._stream = await self._connection._run(self._open_stream)
+            self._batches = self._stream.batches()
+            self.columns = self._stream.columns
+        return self._stream
+
+    async def _next_batch(self):
+        await self._ensure_open()
+        return await self._connection._run(next, self._batches, [])
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._position >= len(self._buffer):
+            self._buffer = await self._next_batch()
+            self._position = 0
+            if not self._buffer:
+                raise StopAsyncIteration
+        row = self._buffer[self._position]
+        self._position += 1
+        return row
+
+    async def batches(self):
+        if self._position < len(self._buffer):
+            rows = self._buffer[self._position:]
+            self._buffer, self._position = [], 0
+            yield rows
+        while True:
+            rows = await self._next_batch()
+            if not rows:
+                return
+            yield rows
+
+    @property
+    def rows_fetched(self):
+        return self._stream.rows_fetched if self._stream else 0
+
+    async def aclose(self):
+        if self._stream is not None:
+            await self._connection._run(self._stream.close)
+
+    async def __aenter__(self):
+        await self._ensure_open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
@@ -0,0 +1,115 @@
+import queue
+import threading
+from contextlib import contextmanager
+from mysql.connector.errors import PoolError
+
+# Default number of connections kept by SwiggyDBConnection
+DEFAULT_POOL_SIZE = 5
+
+# Default number of seconds a caller waits for a free connection before giving up
+DEFAULT_CHECKOUT_TIMEOUT = 30.0
+
+
+class PoolTimeoutError(PoolError):
+    pass
+
+
+# Thread-safe pool of database connections.
+# Connections are created lazily up to `size`, health-checked when they are borrowed and handed back to the pool
+# on release. A caller that cannot get a connection within `checkout_timeout` seconds gets a PoolTimeoutError.
+# `connect` is a zero-argument factory returning a new DB-API connection and `ping` raises if a connection is dead.
+class ConnectionPool:
+    def __init__(self, connect, size=DEFAULT_POOL_SIZE, checkout_timeout=DEFAULT_CHECKOUT_TIMEOUT, ping=None):
+        if size < 1:
+            raise ValueError("Connection pool size must be at least 1")
+        self._connect = connect
+        self._ping = ping or self._mysql_ping
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._in_use = set()
+
+    @staticmethod
+    def _mysql_ping(connection):
+        connection.ping(reconnect=True, attempts=1, delay=0)
+
+    # Borrow a connection, waiting at most `timeout` seconds (defaults to checkout_timeout)
+    def acquire(self, timeout=None):
+        timeout = self.checkout_timeout if timeout is None else timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolTimeoutError(f"No database connection available after {timeout}s (pool size {self.size})")
+        try:
+            connection = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_use.add(id(connection))
+        return connection
+
+    def _checkout(self):
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            # Health check on borrow; dead connections are dropped and replaced
+            try:
+                self._ping(connection)
+                return connection
+            except Exception as e:
+                print(f"Discarding unhealthy pooled connection: {e}")
+                self._close_quietly(connection)
+
+    # Return a borrowed connection. discard=True closes it instead, e.g. when it still has unread rows pending.
+    def release(self, connection, discard=False):
+        with self._lock:
+            if id(connection) not in self._in_use:
+                return
+            self._in_use.discard(id(connection))
+        if discard:
+            self._close_quietly(connection)
+            self._slots.release()
+            return
+        try:
+            # End any open transaction so the next borrower does not inherit locks or a stale read snapshot
+            if getattr(connection, "in_transaction", False):
+                connection.rollback()
+            self._idle.put(connection)
+        except Exception as e:
+            print(f"Discarding pooled connection on release: {e}")
+            self._close_quietly(connection)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    @property
+    def in_use(self):
+        with self._lock:
+            return len(self._in_use)
+
+    # Close every idle connection. Borrowed connections are returned as usual and the pool
+    # opens new connections on demand, so it stays usable after close().
+    def close(self):
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close_quietly(connection)
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
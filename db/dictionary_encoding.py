@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+from db.dimension_cache import DIMENSIONS
+
+# swiggy_source columns copied into fact_swiggy as they are (avg_cost_for_two, votes, price_range)
+MEASURE_SOURCE_COLUMNS = ("average_cost_for_two", "votes", "price_range")
+
+# Dimension source columns stored as numbers; every other one is text
+NUMERIC_SOURCE_COLUMNS = ("rating_stars_out_of_5",)
+
+
+# Codes of a natural key column and its distinct values normalized the way natural_key() does it. The raw column
+# is factorized first, so only distinct values are normalized; values equal after normalization share a code.
+def _factorize_normalized(column, name):
+    codes, uniques = pd.factorize(column)
+    uniques = pd.Series(uniques)
+    if name in NUMERIC_SOURCE_COLUMNS:
+        normalized = uniques.astype(float)
+    else:
+        normalized = uniques.astype(str).str.rstrip().str.casefold()
+    merged, keys = pd.factorize(normalized)
+    return merged[codes], keys.tolist()
+
+
+# One encoded chunk: integer-only fact rows, the dimension members first seen in it as
+# {table: [(id, *values), ...]}, and the number of incomplete rows left out
+class EncodedChunk:
+    def __init__(self, facts, new_members, skipped):
+        self.facts = facts
+        self.new_members = new_members
+        self.skipped = skipped
+
+
+# Turns chunks of source rows (DataFrames with swiggy_source column names) into fact_swiggy rows in-process.
+# Every dimension column of a chunk is factorized with pandas, so only its distinct values are looked up: in the
+# ids resolved or assigned by earlier chunks, then in the DimensionCache. Values found in neither get the next id
+# of their table. commit() moves the ids of a written chunk into the cache; rollback() forgets them.
+# `next_ids` maps every dimension table to the first id free for new members.
+class DictionaryEncoder:
+    def __init__(self, dimension_cache, next_ids):
+        self.dimension_cache = dimension_cache
+        self.next_ids = dict(next_ids)
+        self._committed_ids = dict(next_ids)
+        # Ids resolved by earlier chunks (committed), and ids given to new members not committed yet
+        self._known = {dimension.table: {} for dimension in DIMENSIONS}
+        self._pending = {dimension.table: {} for dimension in DIMENSIONS}
+
+    def encode(self, frame):
+        complete = frame.notna().all(axis=1)
+        frame = frame[complete]
+        columns = []
+        new_members = {}
+        for dimension in DIMENSIONS:
+            codes, ids, members = self._encode_dimension(dimension, frame)
+            columns.append(ids[codes])
+            if members:
+                new_members[dimension.table] = members
+        for column in MEASURE_SOURCE_COLUMNS:
+            columns.append(frame[column].to_numpy(dtype=np.int64))
+        # tolist() gives native ints, which every driver accepts as parameters
+        facts = list(zip(*(column.tolist() for column in columns)))
+        return EncodedChunk(facts, new_members, int((~complete).sum()))
+
+    # Codes of every row, id of every code, and the (id, *values) members created for this chunk
+    def _encode_dimension(self, dimension, frame):
+        codes, keys = None, None
+        for column in dimension.source_columns:
+            column_codes, column_keys = _factorize_normalized(frame[column], column)
+            if codes is None:
+                codes, keys = column_codes, [(key,) for key in column_keys]
+            else:
+                # Combine the codes of the key columns into one code per distinct tuple of values
+                combined, distinct = pd.factorize(codes * len(column_keys) + column_codes)
+                keys = [keys[value // len(column_keys)] + (column_keys[value % len(column_keys)],) for value in distinct.tolist()]
+                codes = combined
+        known = self._known[dimension.table]
+        pending = self._pending[dimension.table]
+        ids = np.zeros(len(keys), dtype=np.int64)
+        new_codes = []
+        for code, key in enumerate(keys):
+            member_id = known.get(key) or pending.get(key)
+            if member_id is None:
+                member_id = self.dimension_cache.lookup(dimension.table, *key)
+                if member_id is not None:
+                    known[key] = member_id
+            if member_id is None:
+                member_id = self.next_ids[dimension.table]
+                self.next_ids[dimension.table] += 1
+                pending[key] = member_id
+                new_codes.append(code)
+            ids[code] = member_id
+        if not new_codes:
+            return codes, ids, []
+        # The first row of every new value gives the member its original spelling
+        first_rows = np.unique(codes, return_index=True)[1][new_codes]
+        values = [frame[column].to_numpy()[first_rows].tolist() for column in dimension.source_columns]
+        return codes, ids, list(zip(ids[new_codes].tolist(), *values))
+
+    def commit(self):
+        for table, pending in self._pending.items():
+            for key, member_id in pending.items():
+                self.dimension_cache.add(table, member_id, *key)
+            self._known[table].update(pending)
+            pending.clear()
+        self._committed_ids = dict(self.next_ids)
+
+    def rollback(self):
+        for pending in self._pending.values():
+            pending.clear()
+        self.next_ids = dict(self._committed_ids)
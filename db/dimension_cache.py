@@ -0,0 +1,82 @@
+import threading
+from collections import namedtuple
+
+# Star-schema dimensions: table, natural key columns, matching swiggy_source columns and fact_swiggy foreign key
+Dimension = namedtuple("Dimension", ["table", "key_columns", "source_columns", "fact_column"])
+
+DIMENSIONS = (
+    Dimension("city", ("name",), ("city",), "city_id"),
+    Dimension("locality", ("name",), ("locality",), "locality_id"),
+    Dimension("restaurants", ("name",), ("restaurant_name",), "rest_id"),
+    Dimension("cuisines", ("name",), ("cuisines",), "cuisine_id"),
+    Dimension("ratings", ("star", "text"), ("rating_stars_out_of_5", "rating_in_text"), "rating_id"),
+    Dimension("delivery", ("availability",), ("has_online_delivery",), "delivery_id"),
+    Dimension("booking", ("availability",), ("has_table_booking",), "booking_id"),
+)
+
+DIMENSIONS_BY_TABLE = {dimension.table: dimension for dimension in DIMENSIONS}
+
+
+# Dictionary key for a natural value. MySQL's default collation compares strings case-insensitively and ignores
+# trailing spaces, so the cache does the same to agree with `WHERE name = %s` lookups.
+def natural_key(values):
+    key = []
+    for value in values:
+        if isinstance(value, str):
+            value = value.rstrip().casefold()
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = float(value)
+        key.append(value)
+    return tuple(key)
+
+
+# In-memory, write-through map from natural value to surrogate id for every dimension table.
+# Each dimension is loaded with one query the first time it is needed (or after it was marked stale), then kept
+# current by add() whenever this process inserts a member, so resolving ids for fact rows needs no round-trip.
+class DimensionCache:
+    def __init__(self):
+        self._ids = {dimension.table: {} for dimension in DIMENSIONS}
+        self._loaded = set()
+        self._lock = threading.RLock()
+
+    # `fetch_all(query)` runs a query and returns its rows
+    def load(self, table, fetch_all):
+        dimension = DIMENSIONS_BY_TABLE[table]
+        rows = fetch_all(f"SELECT id, {', '.join(dimension.key_columns)} FROM {table} ORDER BY id")
+        ids = {}
+        for row in rows:
+            # Keep the lowest id when a natural value is duplicated
+            ids.setdefault(natural_key(row[1:]), row[0])
+        with self._lock:
+            self._ids[table] = ids
+            self._loaded.add(table)
+
+    def warm(self, fetch_all, tables=None):
+        for table in tables or DIMENSIONS_BY_TABLE:
+            self.load(table, fetch_all)
+
+    def is_loaded(self, table):
+        with self._lock:
+            return table in self._loaded
+
+    def lookup(self, table, *values):
+        with self._lock:
+            return self._ids[table].get(natural_key(values))
+
+    def add(self, table, member_id, *values):
+        if member_id is None:
+            return
+        with self._lock:
+            self._ids[table].setdefault(natural_key(values), member_id)
+
+    # Mark dimensions stale so they are reloaded on next use; no tables marks every dimension stale
+    def invalidate(self, tables=None):
+        with self._lock:
+            for table in tables or list(self._ids):
+                if table in self._ids:
+                    self._ids[table] = {}
+                    self._loaded.discard(table)
+
+    def size(self, table):
+        with self._lock:
+            return len(self._ids[table])
@@ -0,0 +1,245 @@
+import json
+import re
+import time
+from db.dimension_cache import DIMENSIONS_BY_TABLE
+
+# Access types that read every row of a table (ALL) or of an index (index)
+FULL_SCAN_ACCESS_TYPES = ("ALL", "index")
+
+# Operation wrappers of EXPLAIN FORMAT=JSON whose content is a single nested block
+_WRAPPER_KEYS = ("ordering_operation", "grouping_operation", "duplicates_removal", "windowing", "buffer_result")
+# Keys holding lists of nested blocks
+_SUBQUERY_KEYS = ("attached_subqueries", "optimized_away_subqueries", "select_list_subqueries", "having_subqueries",
+                  "order_by_subqueries", "group_by_subqueries")
+
+# One EXPLAIN ANALYZE line: "-> Table scan on c  (cost=1.2 rows=10) (actual time=0.1..0.2 rows=10 loops=1)"
+_ANALYZE_ACCESS = re.compile(r"\b(?:scan|lookup|search) on (\w+)", re.IGNORECASE)
+_ANALYZE_ACTUAL = re.compile(r"\(actual time=[\d.e+-]+\.\.[\d.e+-]+ rows=([\d.e+-]+) loops=(\d+)\)")
+
+# `FROM fact_swiggy f` / `JOIN city AS c`: EXPLAIN names tables by alias, this maps aliases back to tables
+_TABLE_ALIAS = re.compile(r"\b(?:from|join)\s+`?(\w+)`?(?:\s+(?:as\s+)?`?(\w+)`?)?", re.IGNORECASE)
+_NOT_ALIASES = {"where", "on", "using", "join", "inner", "left", "right", "cross", "natural", "straight_join", "group",
+                "order", "limit", "having", "union", "window", "for", "lock", "into"}
+
+
+def table_aliases(query):
+    aliases = {}
+    for table, alias in _TABLE_ALIAS.findall(query):
+        aliases.setdefault(table, table)
+        if alias and alias.lower() not in _NOT_ALIASES:
+            aliases.setdefault(alias, table)
+    return aliases
+
+
+def _number(value):
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# One node of a query plan: a table access, or an operation (join, sort, group, subquery) over child nodes
+class PlanNode:
+    def __init__(self, label, table=None, access_type=None, key=None, possible_keys=None, estimated_rows=None,
+                 produced_rows=None, cost=None, filtered=None, condition=None, using_index=False):
+        self.label = label
+        # Table name (or alias) as EXPLAIN reports it, and the underlying table when the alias could be resolved
+        self.table = table
+        self.base_table = table
+        self.access_type = access_type
+        self.key = key
+        self.possible_keys = possible_keys or []
+        # rows_examined_per_scan / rows_produced_per_join of EXPLAIN
+        self.estimated_rows = estimated_rows
+        self.produced_rows = produced_rows
+        # Average rows per loop and number of loops measured by EXPLAIN ANALYZE
+        self.actual_rows = None
+        self.loops = None
+        self.cost = cost
+        self.filtered = filtered
+        self.condition = condition
+        self.using_index = using_index
+        self.warnings = []
+        self.children = []
+
+    @property
+    def is_full_scan(self):
+        return self.access_type in FULL_SCAN_ACCESS_TYPES
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def tables(self):
+        return [node for node in self.walk() if node.table]
+
+
+# Parsed plan of one query: the node tree from EXPLAIN FORMAT=JSON, annotated with the actual row counts of
+# EXPLAIN ANALYZE when that was captured, plus warnings about full scans
+class QueryPlan:
+    def __init__(self, query, root, raw_json, analyze_text=None, captured_at=None):
+        self.query = query
+        self.root = root
+        self.raw_json = raw_json
+        self.analyze_text = analyze_text
+        self.captured_at = captured_at or time.strftime("%Y-%m-%d %H:%M:%S")
+        self.cost = root.cost
+        aliases = table_aliases(query)
+        for node in root.tables():
+            node.base_table = aliases.get(node.table, node.table)
+        if analyze_text:
+            _apply_analyze(root, analyze_text)
+        self.warnings = _flag_full_scans(root)
+
+    # Compact form stored with saved queries (see compare_plans)
+    def to_dict(self):
+        return {
+            "captured_at": self.captured_at,
+            "cost": self.cost,
+            "tables": [
+                {"table": node.base_table, "access_type": node.access_type, "key": node.key, "rows": node.estimated_rows}
+                for node in self.root.tables()
+            ],
+            "warnings": list(self.warnings),
+            "json": self.raw_json,
+        }
+
+
+def parse_json_plan(raw_json):
+    plan = json.loads(raw_json) if isinstance(raw_json, str) else raw_json
+    return _parse_block(plan.get("query_block", plan), "query")
+
+
+def _parse_block(block, label):
+    cost_info = block.get("cost_info", {})
+    node = PlanNode(f"select #{block['select_id']}" if "select_id" in block else label,
+                    cost=_number(cost_info.get("query_cost")))
+    _add_children(node, block)
+    return node
+
+
+def _add_children(node, block):
+    if "table" in block:
+        node.children.append(_parse_table(block["table"]))
+    for item in block.get("nested_loop", []):
+        if "table" in item:
+            node.children.append(_parse_table(item["table"]))
+    for key in _WRAPPER_KEYS:
+        if key in block:
+            wrapper = block[key]
+            detail = " (filesort)" if wrapper.get("using_filesort") else ""
+            detail += " (temporary)" if wrapper.get("using_temporary_table") else ""
+            child = PlanNode(key.replace("_", " ") + detail)
+            _add_children(child, wrapper)
+            node.children.append(child)
+    if "union_result" in block:
+        union = PlanNode("union")
+        for spec in block["union_result"].get("query_specifications", []):
+            union.children.append(_parse_block(spec.get("query_block", spec), "union part"))
+        node.children.append(union)
+    for key in _SUBQUERY_KEYS:
+        for subquery in block.get(key, []):
+            node.children.append(_parse_block(subquery.get("query_block", subquery), "subquery"))
+
+
+def _parse_table(table):
+    cost_info = table.get("cost_info", {})
+    node = PlanNode(
+        table.get("table_name", "?"),
+        table=table.get("table_name"),
+        access_type=table.get("access_type"),
+        key=table.get("key"),
+        possible_keys=table.get("possible_keys"),
+        estimated_rows=_number(table.get("rows_examined_per_scan")),
+        produced_rows=_number(table.get("rows_produced_per_join")),
+        cost=_number(cost_info.get("prefix_cost")),
+        filtered=_number(table.get("filtered")),
+        condition=table.get("attached_condition"),
+        using_index=bool(table.get("using_index")),
+    )
+    materialized = table.get("materialized_from_subquery")
+    if materialized:
+        node.children.append(_parse_block(materialized.get("query_block", materialized), "derived"))
+    _add_children(node, {key: value for key, value in table.items() if key in _SUBQUERY_KEYS})
+    return node
+
+
+# EXPLAIN QUERY PLAN detail of SQLite: "SCAN f", "SCAN c USING COVERING INDEX ix", "SEARCH r USING INTEGER PRIMARY KEY
+# (rowid=?)", "SEARCH f USING INDEX ix_fact_city (city_id=?)"
+_SQLITE_ACCESS = re.compile(r"^(SCAN|SEARCH)\s+(\w+)(?:\s+AS\s+\w+)?(?:\s+USING\s+(?:(COVERING\s+)?INDEX\s+(\w+)|(INTEGER PRIMARY KEY)))?")
+
+
+# Node tree from the (id, parent, notused, detail) rows of SQLite's EXPLAIN QUERY PLAN. Access types are mapped to
+# MySQL's vocabulary (ALL, index, ref, eq_ref) so warnings and compare_plans work the same for both engines.
+def parse_query_plan_rows(rows):
+    root = PlanNode("query")
+    nodes = {0: root}
+    for row in rows:
+        node_id, parent, detail = row[0], row[1], str(row[-1])
+        match = _SQLITE_ACCESS.match(detail)
+        if match is None:
+            node = PlanNode(detail.lower())
+        else:
+            operation, table, covering, index, rowid = match.groups()
+            if operation == "SCAN":
+                access_type, key = ("index", index) if index else ("ALL", None)
+            else:
+                access_type, key = ("eq_ref", "PRIMARY") if rowid else ("ref", index)
+            node = PlanNode(table, table=table, access_type=access_type, key=key, condition=detail,
+                            using_index=bool(covering))
+        nodes[node_id] = node
+        nodes.get(parent, root).children.append(node)
+    return root
+
+
+# Copy actual rows/loops from an EXPLAIN ANALYZE tree onto the table nodes they belong to (matched by table alias)
+def _apply_analyze(root, analyze_text):
+    measured = {}
+    for line in analyze_text.splitlines():
+        access = _ANALYZE_ACCESS.search(line)
+        actual = _ANALYZE_ACTUAL.search(line)
+        if access and actual:
+            measured.setdefault(access.group(1), (float(actual.group(1)), int(actual.group(2))))
+    for node in root.tables():
+        if node.table in measured:
+            node.actual_rows, node.loops = measured[node.table]
+
+
+def _flag_full_scans(root):
+    warnings = []
+    tables = root.tables()
+    for position, node in enumerate(tables):
+        if not node.is_full_scan:
+            continue
+        what = "full table scan" if node.access_type == "ALL" else "full index scan"
+        rows = f" (~{int(node.estimated_rows)} rows)" if node.estimated_rows is not None else ""
+        if node.base_table == "fact_swiggy":
+            message = f"{what} on fact_swiggy{rows}"
+        elif node.base_table in DIMENSIONS_BY_TABLE and position > 0:
+            message = f"{what} on dimension {node.base_table} inside a join{rows}: no usable index on the join column"
+        else:
+            message = f"{what} on {node.base_table}{rows}"
+        node.warnings.append(message)
+        warnings.append(message)
+    return warnings
+
+
+# Differences between a plan stored with a saved query (QueryPlan.to_dict()) and a freshly captured QueryPlan
+def compare_plans(saved, plan):
+    changes = []
+    old_cost, new_cost = saved.get("cost"), plan.cost
+    if old_cost and new_cost and new_cost > old_cost * 1.5:
+        changes.append(f"estimated cost grew from {old_cost:g} to {new_cost:g}")
+    old_tables = {entry["table"]: entry for entry in saved.get("tables", [])}
+    for node in plan.root.tables():
+        old = old_tables.get(node.base_table)
+        if old is None:
+            continue
+        if old.get("access_type") != node.access_type:
+            changes.append(f"{node.base_table}: access type {old.get('access_type')} → {node.access_type}")
+        if old.get("key") != node.key:
+            changes.append(f"{node.base_table}: index {old.get('key') or 'none'} → {node.key or 'none'}")
+    return changes
@@ -0,0 +1,203 @@
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from db.query_cache import normalize_sql
+
+# Queries taking at least this many seconds (wall time) are written to the slow query log
+DEFAULT_SLOW_QUERY_THRESHOLD = 1.0
+
+# Rotation of the slow query log file: size of one file and number of rotated files kept
+SLOW_LOG_MAX_BYTES = 5 * 1024 * 1024
+SLOW_LOG_BACKUPS = 3
+
+# Timings kept per fingerprint for the percentiles, and number of distinct fingerprints tracked
+MAX_SAMPLES_PER_FINGERPRINT = 1000
+MAX_FINGERPRINTS = 500
+
+# One instrumented call.
+# execute_time is the time until the server answered the statement (result header received); it approximates
+# server time plus one network round-trip. wall_time also covers fetching and decoding every row.
+QueryRecord = namedtuple("QueryRecord", [
+    "fingerprint", "query", "action", "wall_time", "execute_time", "rows", "bytes", "cached", "error", "finished_at"
+])
+
+_LITERAL_PATTERN = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|\b\d+(?:\.\d+)?\b|%s")
+_PLACEHOLDER_ROW = r"\(\s*\?(?:\s*,\s*\?)*\s*\)"
+_IN_LIST_PATTERN = re.compile(r"\bin\s*" + _PLACEHOLDER_ROW)
+_VALUES_LIST_PATTERN = re.compile(r"\bvalues\s*" + _PLACEHOLDER_ROW + r"(?:\s*,\s*" + _PLACEHOLDER_ROW + r")*")
+
+_context = threading.local()
+
+
+# Query shape with literals and parameters replaced by `?`, so calls differing only in values group together
+def fingerprint(query):
+    text = _LITERAL_PATTERN.sub("?", normalize_sql(query))
+    text = _IN_LIST_PATTERN.sub("in (?+)", text)
+    return _VALUES_LIST_PATTERN.sub("values (?+)", text)
+
+
+# Rough size of fetched rows: string/bytes lengths plus 8 bytes for any other value
+def estimate_bytes(rows):
+    size = 0
+    for row in rows:
+        for value in row:
+            size += len(value) if isinstance(value, (str, bytes, bytearray)) else 8
+    return size
+
+
+# Label the database calls made by the current thread with the UI action (or job) that caused them
+@contextmanager
+def action_context(action):
+    previous = getattr(_context, "action", None)
+    _context.action = action
+    try:
+        yield
+    finally:
+        _context.action = previous
+
+
+def current_action():
+    return getattr(_context, "action", None)
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    index = min(len(sorted_values), max(1, math.ceil(fraction * len(sorted_values)))) - 1
+    return sorted_values[index]
+
+
+class _FingerprintStats:
+    __slots__ = ("count", "errors", "cache_hits", "total_time", "total_execute_time", "rows", "bytes", "samples",
+                 "actions", "example")
+
+    def __init__(self, example):
+        self.count = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.total_time = 0.0
+        self.total_execute_time = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.samples = deque(maxlen=MAX_SAMPLES_PER_FINGERPRINT)
+        self.actions = {}
+        self.example = example
+
+
+# Collects a QueryRecord for every statement SwiggyDBConnection runs and aggregates them per fingerprint.
+# Statements slower than slow_threshold seconds are logged to slow_log_path (rotated at SLOW_LOG_MAX_BYTES);
+# summary() reports count, latency percentiles, rows and bytes per fingerprint and which UI actions issued them.
+class QueryInstrumentation:
+    def __init__(self, slow_threshold=DEFAULT_SLOW_QUERY_THRESHOLD, slow_log_path=None, recent_size=200):
+        self.slow_threshold = slow_threshold
+        self.enabled = True
+        self._stats = OrderedDict()
+        self._recent = deque(maxlen=recent_size)
+        self._lock = threading.Lock()
+        self.slow_logger = None
+        if slow_log_path:
+            self.slow_logger = logging.getLogger(f"swiggy.slow_query.{id(self)}")
+            self.slow_logger.setLevel(logging.INFO)
+            self.slow_logger.propagate = False
+            handler = RotatingFileHandler(slow_log_path, maxBytes=SLOW_LOG_MAX_BYTES, backupCount=SLOW_LOG_BACKUPS, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.slow_logger.addHandler(handler)
+
+    def record(self, query, wall_time, execute_time=None, rows=0, size=0, cached=False, error=None, action=None):
+        if not self.enabled:
+            return None
+        record = QueryRecord(
+            fingerprint(query), query, action if action is not None else current_action(), wall_time,
+            execute_time, rows, size, cached, str(error) if error else None, time.time()
+        )
+        with self._lock:
+            stats = self._stats.get(record.fingerprint)
+            if stats is None:
+                stats = self._stats[record.fingerprint] = _FingerprintStats(query)
+                if len(self._stats) > MAX_FINGERPRINTS:
+                    self._stats.popitem(last=False)
+            else:
+                self._stats.move_to_end(record.fingerprint)
+            stats.count += 1
+            stats.errors += bool(error)
+            stats.cache_hits += cached
+            stats.total_time += wall_time
+            stats.total_execute_time += execute_time or 0.0
+            stats.rows += rows
+            stats.bytes += size
+            stats.samples.append(wall_time)
+            if record.action:
+                stats.actions[record.action] = stats.actions.get(record.action, 0) + 1
+            self._recent.append(record)
+        if self.slow_logger and wall_time >= self.slow_threshold:
+            self.slow_logger.info(
+                "wall=%.3fs execute=%s rows=%d bytes=%d action=%s error=%s query=%s",
+                wall_time, f"{execute_time:.3f}s" if execute_time is not None else "-", rows, size,
+                record.action or "-", record.error or "-", " ".join(query.split())
+            )
+        return record
+
+    # Time a statement: the block gets a dict and may set "execute_time", "rows", "bytes" and "cached" in it
+    @contextmanager
+    def measure(self, query):
+        start = time.perf_counter()
+        info = {"execute_time": None, "rows": 0, "bytes": 0, "cached": False}
+        try:
+            yield info
+        except Exception as e:
+            self.record(query, time.perf_counter() - start, info["execute_time"], info["rows"], info["bytes"], info["cached"], error=e)
+            raise
+        self.record(query, time.perf_counter() - start, info["execute_time"], info["rows"], info["bytes"], info["cached"])
+
+    def recent(self, limit=50):
+        with self._lock:
+            return list(self._recent)[-limit:]
+
+    # One dict per fingerprint, slowest total time first
+    def summary(self):
+        with self._lock:
+            items = [(key, stats, sorted(stats.samples)) for key, stats in self._stats.items()]
+        report = []
+        for key, stats, samples in items:
+            report.append({
+                "fingerprint": key,
+                "example": stats.example,
+                "count": stats.count,
+                "errors": stats.errors,
+                "cache_hits": stats.cache_hits,
+                "total_time": stats.total_time,
+                "mean": stats.total_time / stats.count,
+                "p50": _percentile(samples, 0.50),
+                "p95": _percentile(samples, 0.95),
+                "p99": _percentile(samples, 0.99),
+                "mean_execute_time": stats.total_execute_time / stats.count,
+                "rows": stats.rows,
+                "bytes": stats.bytes,
+                "actions": dict(stats.actions),
+            })
+        report.sort(key=lambda entry: entry["total_time"], reverse=True)
+        return report
+
+    # summary() as a fixed-width text table
+    def format_summary(self, limit=20):
+        lines = [f"{'calls':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'total s':>9} {'rows':>9}  fingerprint / actions"]
+        for entry in self.summary()[:limit]:
+            lines.append(
+                f"{entry['count']:>6} {entry['p50'] * 1000:>9.1f} {entry['p95'] * 1000:>9.1f} {entry['p99'] * 1000:>9.1f} "
+                f"{entry['total_time']:>9.2f} {entry['rows']:>9}  {entry['fingerprint'][:120]}"
+            )
+            if entry["actions"]:
+                actions = ", ".join(f"{action} ×{count}" for action, count in sorted(entry["actions"].items(), key=lambda a: -a[1]))
+                lines.append(f"{'':>56}  ↳ {actions}")
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._recent.clear()
@@ -0,0 +1,97 @@
+# Default number of rows per page for keyset pagination
+DEFAULT_PAGE_SIZE = 50
+
+
+# Keyset (seek) pagination over a table ordered by its primary key.
+# Instead of LIMIT/OFFSET, each page is fetched with `key > last key seen` (next) or `key < first key seen`
+# (previous) plus LIMIT, so the server seeks straight into the primary key index and every page costs the same
+# however deep you go. The pager remembers the first and last key of the current page between calls.
+class KeysetPager:
+    def __init__(self, db, table_name, key_column, columns=None, where_clause=None, page_size=DEFAULT_PAGE_SIZE):
+        if page_size < 1:
+            raise ValueError("Page size must be at least 1")
+        self.db = db
+        self.table_name = table_name
+        self.key_column = key_column
+        self.columns = list(columns) if columns else None
+        self.where_clause = where_clause
+        self.page_size = page_size
+        self.result_columns = list(self.columns) if self.columns else []
+        self.first_key = None
+        self.last_key = None
+        self.page_number = 0
+        self.has_next = False
+        self.has_previous = False
+
+    def _seek_query(self, after_key=None, before_key=None):
+        # The key is always selected first so the pager can remember it; it is stripped from the returned rows.
+        # All columns are qualified: MySQL rejects a bare * after another select item.
+        select_list = ", ".join([self.key_column] + (self.columns or [f"{self.table_name}.*"]))
+        conditions = [f"({self.where_clause})"] if self.where_clause else []
+        params = []
+        order = "ASC"
+        if after_key is not None:
+            conditions.append(f"{self.key_column} > %s")
+            params.append(after_key)
+        elif before_key is not None:
+            conditions.append(f"{self.key_column} < %s")
+            params.append(before_key)
+            order = "DESC"
+        query = f"SELECT {select_list} FROM {self.table_name}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        # One extra row tells us whether another page exists in this direction
+        query += f" ORDER BY {self.key_column} {order} LIMIT {self.page_size + 1}"
+        return query, tuple(params)
+
+    def _seek(self, after_key=None, before_key=None):
+        query, params = self._seek_query(after_key, before_key)
+        columns, rows = self.db.fetch_query_result(query, params=params, with_columns=True)
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if before_key is not None:
+            rows.reverse()
+        if rows:
+            self.result_columns = columns[1:]
+            self.first_key = rows[0][0]
+            self.last_key = rows[-1][0]
+        return [row[1:] for row in rows], has_more
+
+    def first_page(self):
+        rows, has_more = self._seek()
+        self.page_number = 1 if rows else 0
+        self.has_previous = False
+        self.has_next = has_more
+        return rows
+
+    def next_page(self):
+        if self.page_number == 0:
+            return self.first_page()
+        rows, has_more = self._seek(after_key=self.last_key)
+        if rows:
+            self.page_number += 1
+            self.has_previous = True
+            self.has_next = has_more
+        else:
+            self.has_next = False
+        return rows
+
+    def previous_page(self):
+        if self.page_number <= 1:
+            return self.first_page()
+        rows, has_more = self._seek(before_key=self.first_key)
+        if rows:
+            self.page_number -= 1
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_previous = False
+        return rows
+
+    # Query (and parameters) returning exactly the rows of the current page, without the helper key column
+    def current_page_query(self):
+        conditions = [f"({self.where_clause})"] if self.where_clause else []
+        conditions.append(f"{self.key_column} BETWEEN %s AND %s")
+        query = f"SELECT {', '.join(self.columns or ['*'])} FROM {self.table_name}"
+        query += " WHERE " + " AND ".join(conditions) + f" ORDER BY {self.key_column}"
+        return query, (self.first_key, self.last_key)
@@ -0,0 +1,189 @@
+import io
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from db.source_readers import iter_source_frames, is_plain_csv
+
+# Approximate size of the byte range parsed by one task; bounds the memory of a task and spreads large files
+# over the workers
+DEFAULT_RANGE_BYTES = 16 * 1024 * 1024
+
+# Connections inserting parsed rows at the same time
+DEFAULT_LOADERS = 4
+
+# Rows read at a time from a compressed or columnar file parsed as a whole
+PARSE_CHUNK_SIZE = 100000
+
+
+# (start, end) byte offsets covering the data lines of a CSV file in pieces of about range_bytes. Every boundary
+# is moved forward to just after a newline, so each range holds whole lines; the header line is left out.
+# Like LOAD DATA ... LINES TERMINATED BY '\n', this assumes no quoted field contains a newline.
+def byte_ranges(path, range_bytes=DEFAULT_RANGE_BYTES):
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()
+        start = f.tell()
+        ranges = []
+        while start < size:
+            f.seek(min(start + range_bytes, size))
+            if f.tell() < size:
+                f.readline()
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+# Parse tasks of a file: its byte ranges when it is a plain CSV, otherwise the whole file (start and end None)
+def _file_tasks(path, range_bytes):
+    if is_plain_csv(path):
+        return [(path, start, end) for start, end in byte_ranges(path, range_bytes)]
+    return [(path, None, None)]
+
+
+# Parses one byte range of a CSV file (latin1, like load_from_csv), or a whole source file of any format read by
+# source_readers when start is None, into parameter tuples in `columns` order. Every value is coerced to its
+# `types` entry (str, int or float) and missing values become None. With validate=True the rows are first checked by
+# db/validation.py and only the clean ones are kept; the rejected ones come back for the parent to quarantine as
+# (rows, failed rules, row numbers within the range, source label). Runs in a worker process; returns the rows,
+# the time spent and the rejections (None without validation).
+def parse_range(path, start, end, columns, types, validate=False):
+    import pandas as pd
+    began = time.perf_counter()
+    if start is None:
+        frames = list(iter_source_frames(path, list(columns), PARSE_CHUNK_SIZE, as_text=validate))
+        frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=list(columns))
+        size = os.path.getsize(path)
+    else:
+        with open(path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        # Validation parses the numbers itself and quarantines rejected rows as the text of the file
+        text_options = {"dtype": str, "keep_default_na": False, "na_values": [""]} if validate else {
+            "dtype": {column: str for column, kind in zip(columns, types) if kind is str}}
+        frame = pd.read_csv(io.BytesIO(data), encoding="latin1", header=None, names=list(columns), **text_options)
+        size = end - start
+    checked = len(frame)
+    rejections = None
+    validate_seconds = 0.0
+    if validate:
+        from db.validation import validate_frame
+        validate_start = time.perf_counter()
+        clean, failed, rejected = validate_frame(frame)
+        source = path if start is None else f"{path}:{start}-{end}"
+        mask = rejected.to_numpy()
+        rejections = (frame[mask], failed[mask], mask.nonzero()[0] + 1, source)
+        frame = clean
+        validate_seconds = time.perf_counter() - validate_start
+    for column, kind in zip(columns, types):
+        if kind is int:
+            frame[column] = pd.to_numeric(frame[column]).astype("Int64")
+        elif kind is float:
+            frame[column] = pd.to_numeric(frame[column]).astype(float)
+    frame = frame.astype(object).where(frame.notna(), None)
+    rows = list(frame.itertuples(index=False, name=None))
+    stats = {"pid": os.getpid(), "bytes": size, "rows": len(rows), "checked": checked, "validate_seconds": validate_seconds,
+             "seconds": time.perf_counter() - began}
+    return rows, stats, rejections
+
+
+# Loads source files into a table. Plain CSV files are cut into byte ranges and other formats parsed whole, by
+# `workers` processes (a thread when workers is 1); parsed rows are queued (bounded, so parsing cannot run ahead of
+# loading by more than a few ranges) and inserted `chunk_size` rows per executemany by `loaders` threads, each on its
+# own pooled connection of `db` and committing after every chunk. Returns the totals and the throughput of every parse worker and loader.
+# With a `validator` (db/validation.py SourceValidator) the workers validate their rows and the rejected ones are
+# recorded by it here, in the parent, so its counts and quarantine file cover the whole load.
+def parallel_load(db, paths, query, columns, types, workers=None, loaders=DEFAULT_LOADERS, chunk_size=10000,
+                  range_bytes=DEFAULT_RANGE_BYTES, validator=None):
+    workers = workers or os.cpu_count() or 1
+    tasks = [task for path in paths for task in _file_tasks(path, range_bytes)]
+    parsed = queue.Queue(maxsize=loaders * 2)
+    errors = []
+    loader_stats = []
+
+    def load():
+        stats = {"loader": threading.current_thread().name, "rows": 0, "seconds": 0.0}
+        loader_stats.append(stats)
+        finished = False
+        try:
+            with db._cursor() as (connection, cursor):
+                while True:
+                    rows = parsed.get()
+                    if rows is None:
+                        finished = True
+                        return
+                    if errors:
+                        continue
+                    try:
+                        began = time.perf_counter()
+                        for offset in range(0, len(rows), chunk_size):
+                            cursor.executemany(query, rows[offset:offset + chunk_size])
+                            connection.commit()
+                        stats["rows"] += len(rows)
+                        stats["seconds"] += time.perf_counter() - began
+                    except Exception as e:
+                        connection.rollback()
+                        errors.append(e)
+        except Exception as e:
+            # No connection (checkout failed) or it broke: record why, and keep draining the queue up to this
+            # loader's sentinel so the parser side never blocks on a put() nobody will take
+            errors.append(e)
+            while not finished:
+                finished = parsed.get() is None
+
+    threads = [threading.Thread(target=load, name=f"csv-loader-{number}", daemon=True) for number in range(loaders)]
+    for thread in threads:
+        thread.start()
+    worker_stats = {}
+    if workers > 1:
+        # Spawned rather than forked: the parent holds database connections and threads
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    else:
+        # A single parser gains nothing from a separate process; a thread still overlaps it with loading
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="csv-parser")
+    try:
+        with executor as pool:
+            remaining = iter(tasks)
+            running = set()
+            while not errors:
+                for task in remaining:
+                    running.add(pool.submit(parse_range, *task, columns, types, validator is not None))
+                    if len(running) >= workers * 2:
+                        break
+                if not running:
+                    break
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rows, stats, rejections = future.result()
+                    parsed.put(rows)
+                    if rejections is not None:
+                        rejected_rows, failed, row_numbers, source = rejections
+                        validator.record(rejected_rows, failed, source, row_numbers, checked=stats["checked"],
+                                         seconds=stats["validate_seconds"])
+                    totals = worker_stats.setdefault(stats["pid"], {"ranges": 0, "bytes": 0, "rows": 0, "seconds": 0.0})
+                    for key in ("bytes", "rows", "seconds"):
+                        totals[key] += stats[key]
+                    totals["ranges"] += 1
+            for future in running:
+                future.cancel()
+    except Exception as e:
+        errors.append(e)
+    finally:
+        for _ in threads:
+            parsed.put(None)
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+
+    for stats in list(worker_stats.values()) + loader_stats:
+        stats["rows_per_sec"] = stats["rows"] / stats["seconds"] if stats["seconds"] > 0 else float(stats["rows"])
+    return {
+        "rows": sum(stats["rows"] for stats in loader_stats),
+        "ranges": len(tasks),
+        "parse_workers": [dict(stats, pid=pid) for pid, stats in worker_stats.items()],
+        "loaders": loader_stats,
+    }
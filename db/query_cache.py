@@ -0,0 +1,155 @@
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# Defaults for the query result cache of SwiggyDBConnection
+DEFAULT_CACHE_ENTRIES = 256
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+DEFAULT_CACHE_TTL = 300.0
+
+# Only plain reads are cached; anything that can return different rows for the same text is skipped
+_CACHEABLE_PATTERN = re.compile(r"^\s*\(*\s*(select|with|show|describe|desc)\b", re.IGNORECASE)
+_VOLATILE_PATTERN = re.compile(
+    r"\b(rand|uuid|uuid_short|now|sysdate|curdate|curtime|current_timestamp|current_date|current_time|"
+    r"unix_timestamp|utc_timestamp|connection_id|last_insert_id|found_rows|sleep)\b|\bfor\s+update\b|\binto\s+outfile\b",
+    re.IGNORECASE
+)
+# Tables written by a statement: INSERT INTO t, UPDATE t, DELETE FROM t, DROP/ALTER/CREATE/TRUNCATE TABLE t, JOIN t
+_WRITTEN_TABLE_PATTERN = re.compile(
+    r"\b(?:into|update|from|join|table|exists|truncate)\s+(?:`?\w+`?\s*\.\s*)?`?(\w+)`?", re.IGNORECASE
+)
+_QUOTED_OR_WHITESPACE = re.compile(r"('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")|\s+")
+
+
+# Normalized SQL: whitespace collapsed, keywords/identifiers lower-cased, trailing semicolons dropped.
+# Quoted literals are kept verbatim so 'Goa' and 'goa' stay different keys.
+def normalize_sql(query):
+    parts = []
+    last = 0
+    for match in _QUOTED_OR_WHITESPACE.finditer(query):
+        parts.append(query[last:match.start()].lower())
+        parts.append(match.group(1) if match.group(1) else " ")
+        last = match.end()
+    parts.append(query[last:].lower())
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def is_cacheable(query):
+    return bool(_CACHEABLE_PATTERN.match(query)) and not _VOLATILE_PATTERN.search(query)
+
+
+# Tables a write statement may modify; an empty set means "unknown", which invalidates everything
+def written_tables(query):
+    return {name.lower() for name in _WRITTEN_TABLE_PATTERN.findall(query)} - {"if", "select"}
+
+
+def _estimate_size(value):
+    columns, rows = value
+    size = sys.getsizeof(rows) + sum(sys.getsizeof(c) for c in columns)
+    for row in rows:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row)
+    return size
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at")
+
+    def __init__(self, value, size, expires_at):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+# LRU + TTL cache of query results keyed by (normalized SQL, parameters).
+# Bounded by entry count and by an estimate of the bytes held; entries older than `ttl` seconds are dropped on
+# access. Writers call invalidate() with the tables they touched, which drops every cached query mentioning one
+# of them. `generation` lets a reader detect that an invalidation happened while its query was running.
+class QueryResultCache:
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES, max_bytes=DEFAULT_CACHE_BYTES, ttl=DEFAULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    @staticmethod
+    def make_key(query, params=None):
+        return normalize_sql(query), tuple(params) if params else ()
+
+    # Returns the cached (columns, rows) or None on a miss
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key, value, generation=None):
+        if not self.enabled:
+            return
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            # An invalidation ran while the result was being fetched; it may already be stale
+            if generation is not None and generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    # Drop cached results that reference any of `tables`; no tables (or None) clears the whole cache
+    def invalidate(self, tables=None):
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            if not tables:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            pattern = re.compile(r"\b(?:%s)\b" % "|".join(re.escape(t.lower()) for t in tables))
+            for key in [k for k in self._entries if pattern.search(k[0])]:
+                self._remove(key)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
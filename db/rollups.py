@@ -0,0 +1,351 @@
+import re
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from mysql.connector import Error
+from db.dimension_cache import DIMENSIONS_BY_TABLE
+from db.explain import table_aliases
+
+# Summary table of fact_swiggy grouped by `key_columns` (fact_swiggy column names, so queries joining dimensions on
+# them work unchanged against the rollup)
+Rollup = namedtuple("Rollup", ["table", "key_columns"])
+
+# Smallest first: the router picks the first rollup that has every fact column a query uses
+ROLLUPS = (
+    Rollup("rollup_price_range", ("price_range",)),
+    Rollup("rollup_availability", ("delivery_id", "booking_id")),
+    Rollup("rollup_city", ("city_id",)),
+    Rollup("rollup_cuisine", ("cuisine_id",)),
+    Rollup("rollup_city_cuisine", ("city_id", "cuisine_id")),
+)
+
+# Rating histogram bands over ratings.star: rating_band_<n> counts facts with edges[n-1] <= star < edges[n] (the
+# last band includes its upper edge)
+RATING_BANDS = (0.0, 2.5, 3.5, 4.0, 4.5, 5.0)
+
+# Additive measures kept per group, and the expression computing each one from fact_swiggy f JOIN ratings ra
+MEASURES = (
+    ("fact_count", "BIGINT", "COUNT(*)"),
+    ("sum_cost", "BIGINT", "SUM(f.avg_cost_for_two)"),
+    ("sum_votes", "BIGINT", "SUM(f.votes)"),
+    ("sum_rating", "DOUBLE", "SUM(ra.star)"),
+) + tuple(
+    (f"rating_band_{band}", "BIGINT",
+     f"SUM(CASE WHEN ra.star >= {low} AND ra.star {'<=' if band == len(RATING_BANDS) - 1 else '<'} {high} THEN 1 ELSE 0 END)")
+    for band, (low, high) in enumerate(zip(RATING_BANDS, RATING_BANDS[1:]), start=1)
+)
+MEASURE_COLUMNS = [name for name, _, _ in MEASURES]
+
+# Seconds between the full checks of the rollups against fact_swiggy (see _check_facts)
+DEFAULT_CHECK_INTERVAL = 30.0
+
+STATE_TABLE = "rollup_state"
+_STATE_KEY = "fact_swiggy"
+
+FACT_COLUMNS = {
+    "fact_id", "city_id", "locality_id", "rest_id", "cuisine_id", "rating_id", "delivery_id", "booking_id",
+    "avg_cost_for_two", "votes", "price_range", "source_hash",
+}
+
+# Aggregates over fact_swiggy the rollups can answer, and their rollup equivalent (`q` keeps the table qualifier).
+# Counts are cast back to integers, and are 0 rather than NULL when no group matches, as COUNT(*) is; AVG divides by
+# a decimal so every engine keeps the fraction.
+_AGGREGATE_REWRITES = (
+    (re.compile(r"\bcount\s*\(\s*(?:\*|1)\s*\)", re.IGNORECASE), lambda q: "CAST(COALESCE(SUM(fact_count), 0) AS SIGNED)"),
+    (re.compile(r"\bsum\s*\(\s*(?:(\w+)\s*\.\s*)?avg_cost_for_two\s*\)", re.IGNORECASE), lambda q: f"SUM({q}sum_cost)"),
+    (re.compile(r"\bsum\s*\(\s*(?:(\w+)\s*\.\s*)?votes\s*\)", re.IGNORECASE), lambda q: f"SUM({q}sum_votes)"),
+    (re.compile(r"\bavg\s*\(\s*(?:(\w+)\s*\.\s*)?avg_cost_for_two\s*\)", re.IGNORECASE),
+     lambda q: f"(SUM({q}sum_cost) / (SUM({q}fact_count) * 1.0))"),
+    (re.compile(r"\bavg\s*\(\s*(?:(\w+)\s*\.\s*)?votes\s*\)", re.IGNORECASE),
+     lambda q: f"(SUM({q}sum_votes) / (SUM({q}fact_count) * 1.0))"),
+)
+_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_UNSUPPORTED = re.compile(
+    r"\b(?:union|intersect|except|over|into|for\s+update|distinct|count|sum|avg|min|max|group_concat|std\w*|variance|"
+    r"var_\w+|bit_and|bit_or|bit_xor|json_\w*agg|any_value|rand|now|sleep)\b", re.IGNORECASE
+)
+_IDENTIFIER = re.compile(r"\b(?:(\w+)\s*\.\s*)?(\w+)\b")
+_STAR = re.compile(r"\bselect\s+\*|[.,]\s*\*", re.IGNORECASE)
+_SELECT_LIST = re.compile(r"^\s*select\s+(.*?)\s+from\b", re.IGNORECASE | re.DOTALL)
+_ITEM_ALIAS = re.compile(r"[\w)`'\"]\s+(?:as\s+)?(\w+|`[^`]+`)\s*$", re.IGNORECASE)
+# FROM clause up to the next clause; a comma in it is an implicit join the table check cannot see
+_FROM_CLAUSE = re.compile(r"\bfrom\b(.*?)(?=\bwhere\b|\bgroup\b|\bhaving\b|\border\b|\blimit\b|$)", re.IGNORECASE | re.DOTALL)
+_PLACEHOLDER = "\0{}\0"
+
+
+def _split_top_level(text):
+    items, depth, start = [], 0, 0
+    for index, char in enumerate(text):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            items.append(text[start:index])
+            start = index + 1
+    items.append(text[start:])
+    return items
+
+
+# Rewrite an aggregate query over fact_swiggy to read a rollup instead: returns (rollup, query) or None when the
+# query is not answerable from the rollups. Only COUNT(*), SUM/AVG of avg_cost_for_two and votes, grouping and
+# filtering on the rollup's key columns and joins to dimension tables qualify; anything else is left alone.
+def rewrite_for_rollup(query):
+    query = query.strip().rstrip(";")
+    if not re.match(r"^\s*select\b", query, re.IGNORECASE) or len(re.findall(r"\bselect\b", query, re.IGNORECASE)) != 1:
+        return None
+    tables = {table.lower() for table, alias in table_aliases(query).items() if table == alias}
+    if "fact_swiggy" not in tables or not tables <= {"fact_swiggy"} | DIMENSIONS_BY_TABLE.keys():
+        return None
+    # Mask literals, then the rewritable aggregates, so what is left can be checked for unsupported constructs
+    literals = []
+    masked = _LITERAL.sub(lambda m: literals.append(m.group(0)) or _PLACEHOLDER.format(f"L{len(literals) - 1}"), query)
+    replacements = []
+    for pattern, rewrite in _AGGREGATE_REWRITES:
+        def substitute(match, rewrite=rewrite):
+            qualifier = f"{match.group(1)}." if match.groups() and match.group(1) else ""
+            replacements.append((match.group(0), rewrite(qualifier)))
+            return _PLACEHOLDER.format(f"A{len(replacements) - 1}")
+        masked = pattern.sub(substitute, masked)
+    remaining = _strip_placeholders(masked)
+    from_clause = _FROM_CLAUSE.search(remaining)
+    if not replacements or _UNSUPPORTED.search(remaining) or _STAR.search(remaining) or not from_clause or "," in from_clause.group(1):
+        return None
+    used = {name.lower() for _, name in _IDENTIFIER.findall(remaining) if name.lower() in FACT_COLUMNS}
+    rollup = next((rollup for rollup in ROLLUPS if used <= set(rollup.key_columns)), None)
+    if rollup is None:
+        return None
+    masked = _alias_select_items(masked, replacements, literals)
+    rewritten = re.sub(r"\bfact_swiggy\b", rollup.table, masked)
+    rewritten = re.sub("\0A(\\d+)\0", lambda m: replacements[int(m.group(1))][1], rewritten)
+    rewritten = re.sub("\0L(\\d+)\0", lambda m: literals[int(m.group(1))], rewritten)
+    return rollup, rewritten
+
+
+def _strip_placeholders(text):
+    return re.sub("\0[AL]\\d+\0", " ", text)
+
+
+# Select items holding a rewritten aggregate get their original text as alias, so result columns keep the names
+# the query would have had against fact_swiggy
+def _alias_select_items(masked, replacements, literals):
+    match = _SELECT_LIST.match(masked)
+    if not match:
+        return masked
+    items = []
+    for item in _split_top_level(match.group(1)):
+        alias = _ITEM_ALIAS.search(re.sub("\0[AL]\\d+\0", "x", item).strip())
+        if "\0A" in item and (alias is None or alias.group(1).lower() == "end"):
+            original = re.sub("\0A(\\d+)\0", lambda m: replacements[int(m.group(1))][0], item.strip())
+            original = re.sub("\0L(\\d+)\0", lambda m: literals[int(m.group(1))], original)
+            if "`" not in original:
+                item = f"{item.rstrip()} AS `{original}`"
+        items.append(item)
+    return masked[:match.start(1)] + ",".join(items) + masked[match.end(1):]
+
+
+# Maintains the ROLLUPS tables for a SwiggyDBConnection and routes matching queries to them.
+# build() (run after initialize_other_tables) fills them from scratch; refresh() adds only the facts above the
+# fact_id watermark stored in rollup_state, upserting their sums into the existing groups. Writes to fact_swiggy
+# made inside expected_writes() (the DB layer's own inserts) only mark the rollups for an incremental refresh;
+# any other write to fact_swiggy (deletes, custom statements) forces a rebuild before the next routed query.
+# Writes made by other connections or processes are caught by _check_facts before routing: facts appended above the
+# watermark (or deleted from the top) at once, other deletions within check_interval seconds.
+class RollupManager:
+    def __init__(self, db, enabled=True, check_interval=DEFAULT_CHECK_INTERVAL):
+        self.db = db
+        self.enabled = enabled
+        self.check_interval = check_interval
+        self._last_full_check = None
+        self.routed_queries = 0
+        self._built = None  # unknown until checked against the database
+        self._stale = False
+        self._needs_rebuild = False
+        self._lock = threading.RLock()
+        self._context = threading.local()
+        db.add_write_listener(self._on_write)
+
+    def _on_write(self, tables):
+        if tables is not None and "fact_swiggy" not in tables:
+            return
+        if getattr(self._context, "expected", False):
+            self._stale = True
+        else:
+            self._needs_rebuild = True
+
+    # Force a rebuild before the next refresh (e.g. after facts were deleted)
+    def invalidate(self):
+        self._needs_rebuild = True
+
+    # Fact writes in this block are appends the caller follows with refresh() (or a rebuild)
+    @contextmanager
+    def expected_writes(self):
+        previous = getattr(self._context, "expected", False)
+        self._context.expected = True
+        try:
+            yield
+        finally:
+            self._context.expected = previous
+
+    def create_tables(self):
+        measures = ",\n    ".join(f"{name} {kind} NOT NULL" for name, kind, _ in MEASURES)
+        for rollup in ROLLUPS:
+            keys = ",\n    ".join(f"{column} INT NOT NULL" for column in rollup.key_columns)
+            self.db._execute_commit(f"""
+            CREATE TABLE IF NOT EXISTS {rollup.table} (
+                {keys},
+                {measures},
+                PRIMARY KEY ({', '.join(rollup.key_columns)})
+            )
+            """)
+        self.db._execute_commit(f"""
+        CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+            name VARCHAR(64) PRIMARY KEY,
+            fact_watermark BIGINT NOT NULL,
+            fact_count BIGINT NOT NULL,
+            refreshed_at DOUBLE NOT NULL
+        )
+        """)
+
+    def drop_tables(self):
+        for table in [rollup.table for rollup in ROLLUPS] + [STATE_TABLE]:
+            self.db._execute_commit(f"DROP TABLE IF EXISTS {table}")
+        with self._lock:
+            self._built = False
+
+    # Group-by over the facts with fact_id in (low, high], named new_<column> for accumulate_statement
+    @staticmethod
+    def _delta_select(rollup):
+        keys = ", ".join(f"f.{column} AS new_{column}" for column in rollup.key_columns)
+        measures = ", ".join(f"{expression} AS new_{name}" for name, _, expression in MEASURES)
+        return (f"SELECT {keys}, {measures} FROM fact_swiggy f JOIN ratings ra ON ra.id = f.rating_id "
+                f"WHERE f.fact_id > %s AND f.fact_id <= %s GROUP BY {', '.join(f'f.{column}' for column in rollup.key_columns)}")
+
+    def _accumulate(self, cursor, low, high):
+        for rollup in ROLLUPS:
+            statement = self.db.backend.accumulate_statement(rollup.table, list(rollup.key_columns), MEASURE_COLUMNS, self._delta_select(rollup))
+            cursor.execute(statement, (low, high))
+
+    # Recompute every rollup from fact_swiggy in one transaction
+    def build(self):
+        with self._lock:
+            start = time.perf_counter()
+            self._needs_rebuild = self._stale = False
+            if not self.is_built():
+                self.create_tables()
+            with self.db._cursor(buffered=True) as (connection, cursor):
+                try:
+                    cursor.execute("SELECT COALESCE(MAX(fact_id), 0), COUNT(*) FROM fact_swiggy")
+                    high, count = cursor.fetchone()
+                    for rollup in ROLLUPS:
+                        cursor.execute(f"DELETE FROM {rollup.table}")
+                    self._accumulate(cursor, 0, high)
+                    cursor.execute(f"DELETE FROM {STATE_TABLE} WHERE name = %s", (_STATE_KEY,))
+                    cursor.execute(f"INSERT INTO {STATE_TABLE} (name, fact_watermark, fact_count, refreshed_at) VALUES (%s, %s, %s, %s)",
+                                   (_STATE_KEY, high, count, time.time()))
+                    connection.commit()
+                    self._last_full_check = time.monotonic()
+                except Error:
+                    connection.rollback()
+                    self._needs_rebuild = True
+                    raise
+                finally:
+                    self.db.invalidate_cache([rollup.table for rollup in ROLLUPS] + [STATE_TABLE])
+            self._built = True
+            elapsed = time.perf_counter() - start
+            print(f"Rollups built from {count} facts in {elapsed:.2f}s")
+            return {"facts": int(count), "appended": int(count), "rebuilt": True, "seconds": elapsed}
+
+    # Fold facts added since the last refresh into the rollups (a rebuild when that is not possible)
+    def refresh(self):
+        with self._lock:
+            if self._needs_rebuild or not self.is_built():
+                return self.build()
+            start = time.perf_counter()
+            self._stale = False
+            with self.db._cursor(buffered=True) as (connection, cursor):
+                try:
+                    cursor.execute(f"SELECT fact_watermark FROM {STATE_TABLE} WHERE name = %s", (_STATE_KEY,))
+                    row = cursor.fetchone()
+                    low = int(row[0]) if row else None
+                    high = None
+                    if low is not None:
+                        cursor.execute("SELECT COALESCE(MAX(fact_id), 0) FROM fact_swiggy")
+                        high = int(cursor.fetchone()[0])
+                    if low is None or high <= low:
+                        return {"facts": 0, "appended": 0, "rebuilt": False, "seconds": time.perf_counter() - start}
+                    cursor.execute("SELECT COUNT(*) FROM fact_swiggy WHERE fact_id > %s AND fact_id <= %s", (low, high))
+                    appended = int(cursor.fetchone()[0])
+                    # Move the watermark first, conditionally: a concurrent refresh from another client that got
+                    # there first makes this one a no-op instead of adding the same facts twice
+                    cursor.execute(f"UPDATE {STATE_TABLE} SET fact_watermark = %s, fact_count = fact_count + %s, refreshed_at = %s "
+                                   f"WHERE name = %s AND fact_watermark = %s", (high, appended, time.time(), _STATE_KEY, low))
+                    if cursor.rowcount != 1:
+                        connection.rollback()
+                        return {"facts": 0, "appended": 0, "rebuilt": False, "seconds": time.perf_counter() - start}
+                    self._accumulate(cursor, low, high)
+                    connection.commit()
+                except Error:
+                    connection.rollback()
+                    self._stale = True
+                    raise
+                finally:
+                    self.db.invalidate_cache([rollup.table for rollup in ROLLUPS] + [STATE_TABLE])
+            if low is None:
+                # Tables exist but were never filled
+                return self.build()
+            return {"facts": appended, "appended": appended, "rebuilt": False, "seconds": time.perf_counter() - start}
+
+    def is_built(self):
+        if self._built is None:
+            names = set(self.db._catalog().table_names())
+            self._built = STATE_TABLE in names and all(rollup.table in names for rollup in ROLLUPS)
+        return self._built
+
+    # Marks the rollups stale or for a rebuild when fact_swiggy no longer matches rollup_state, whoever changed it.
+    # MAX(fact_id) is read from the primary key, so it is checked every time: facts above the watermark are appends
+    # to fold in, and a maximum below it means facts were deleted. Deletions below the watermark only show in the fact
+    # count, which takes a scan; with full=True it is compared with the stored count too. Measures updated in place
+    # are not visible to either check.
+    def _check_facts(self, full):
+        with self.db._cursor(buffered=True) as (connection, cursor):
+            cursor.execute(f"SELECT fact_watermark, fact_count FROM {STATE_TABLE} WHERE name = %s", (_STATE_KEY,))
+            row = cursor.fetchone()
+            if row is None:
+                self._needs_rebuild = True
+                return
+            watermark, stored_count = int(row[0]), int(row[1])
+            cursor.execute("SELECT COALESCE(MAX(fact_id), 0) FROM fact_swiggy")
+            high = int(cursor.fetchone()[0])
+            if high < watermark:
+                self._needs_rebuild = True
+                return
+            if full:
+                cursor.execute("SELECT COUNT(*) FROM fact_swiggy WHERE fact_id <= %s", (watermark,))
+                self._last_full_check = time.monotonic()
+                if int(cursor.fetchone()[0]) != stored_count:
+                    self._needs_rebuild = True
+                    return
+        if high > watermark:
+            self._stale = True
+
+    # Rollup version of `query` when one can answer it, after bringing the rollups up to date; None otherwise
+    def route(self, query):
+        if not self.enabled:
+            return None
+        match = rewrite_for_rollup(query)
+        if match is None:
+            return None
+        try:
+            with self._lock:
+                if not self._needs_rebuild and self.is_built():
+                    full = self._last_full_check is None or time.monotonic() - self._last_full_check >= self.check_interval
+                    self._check_facts(full)
+                if self._needs_rebuild or self._stale or not self.is_built():
+                    self.refresh()
+        except Error as e:
+            print(f"Rollups unavailable, answering from fact_swiggy: {e}")
+            return None
+        self.routed_queries += 1
+        return match[1]
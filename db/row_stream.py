@@ -0,0 +1,156 @@
+from db.instrumentation import estimate_bytes
+
+# Default number of rows pulled from the server per fetchmany() call when streaming results
+DEFAULT_FETCH_BATCH_SIZE = 1000
+
+
+# Incremental reader over the result of a query that has already been executed on a pooled connection.
+# Rows are pulled with fetchmany(batch_size) from an unbuffered cursor, so only one batch is held in memory.
+# The stream is an iterator over rows; batches() yields lists of rows instead. It owns its connection until it
+# is exhausted or closed; closing it early discards the connection because the server still has rows to send.
+# `on_close(stream)` is called once when the stream is closed. With keep_bytes, the rows read are also kept while
+# they stay under that many bytes, so a fully read result can be handed to the query cache (see complete_rows).
+class RowStream:
+    def __init__(self, pool, connection, cursor, batch_size=DEFAULT_FETCH_BATCH_SIZE, on_close=None, keep_bytes=0):
+        self._pool = pool
+        self._on_close = on_close
+        self._connection = connection
+        self._cursor = cursor
+        self.batch_size = batch_size
+        self.columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        self.rows_fetched = 0
+        self.bytes_fetched = 0
+        self._buffer = []
+        self._position = 0
+        self._exhausted = cursor.description is None
+        self._closed = False
+        self._keep_bytes = keep_bytes
+        self._kept = [] if keep_bytes > 0 else None
+        if self._exhausted:
+            self.close()
+
+    def _fetch_batch(self):
+        if self._exhausted or self._closed:
+            return []
+        rows = self._cursor.fetchmany(self.batch_size)
+        if not rows:
+            self._exhausted = True
+            self.close()
+            return []
+        self.rows_fetched += len(rows)
+        self.bytes_fetched += estimate_bytes(rows)
+        if self._kept is not None:
+            if self.bytes_fetched > self._keep_bytes:
+                self._kept = None
+            else:
+                self._kept.extend(rows)
+        return rows
+
+    # Every row of the result when it was read to the end within keep_bytes; None otherwise
+    @property
+    def complete_rows(self):
+        return self._kept if self._exhausted and self._kept is not None else None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._position >= len(self._buffer):
+            self._buffer = self._fetch_batch()
+            self._position = 0
+            if not self._buffer:
+                raise StopIteration
+        row = self._buffer[self._position]
+        self._position += 1
+        return row
+
+    def batches(self):
+        # Hand out whatever is left of a batch partially consumed through next() first
+        if self._position < len(self._buffer):
+            rows = self._buffer[self._position:]
+            self._buffer, self._position = [], 0
+            yield rows
+        while True:
+            rows = self._fetch_batch()
+            if not rows:
+                return
+            yield rows
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._on_close:
+            self._on_close(self)
+        if self._exhausted:
+            try:
+                self._cursor.close()
+            except Exception:
+                pass
+            self._pool.release(self._connection)
+        else:
+            self._pool.release(self._connection, discard=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+# RowStream over a result already in memory (a query cache hit), holding no connection
+class CachedRowStream:
+    def __init__(self, columns, rows, batch_size=DEFAULT_FETCH_BATCH_SIZE):
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self._rows = rows
+        self._position = 0
+        self.rows_fetched = 0
+        self.bytes_fetched = 0
+        self._closed = False
+
+    def _fetch_batch(self):
+        if self._closed:
+            return []
+        rows = list(self._rows[self._position:self._position + self.batch_size])
+        self._position += len(rows)
+        self.rows_fetched += len(rows)
+        self.bytes_fetched += estimate_bytes(rows)
+        if not rows:
+            self.close()
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._closed or self._position >= len(self._rows):
+            self.close()
+            raise StopIteration
+        row = self._rows[self._position]
+        self._position += 1
+        self.rows_fetched += 1
+        self.bytes_fetched += estimate_bytes([row])
+        return row
+
+    def batches(self):
+        while True:
+            rows = self._fetch_batch()
+            if not rows:
+                return
+            yield rows
+
+    def close(self):
+        self._closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
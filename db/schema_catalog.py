@@ -0,0 +1,103 @@
+import re
+import threading
+
+# Everything the catalog knows, in one round-trip: a row per table, per column and per index column of the current
+# database, told apart by the first field
+CATALOG_QUERY = """
+SELECT 'table', TABLE_NAME, NULL, TABLE_ROWS, TABLE_TYPE, NULL, NULL, NULL, NULL
+FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()
+UNION ALL
+SELECT 'column', TABLE_NAME, COLUMN_NAME, ORDINAL_POSITION, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY, COLUMN_DEFAULT, EXTRA
+FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE()
+UNION ALL
+SELECT 'index', TABLE_NAME, COLUMN_NAME, SEQ_IN_INDEX, INDEX_NAME, NON_UNIQUE, NULL, NULL, NULL
+FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE()
+"""
+
+# Statements that change the schema and therefore make the catalog stale
+_DDL_PATTERN = re.compile(r"^\s*(create|drop|alter|rename|truncate)\b", re.IGNORECASE)
+
+
+def is_ddl(query):
+    return bool(_DDL_PATTERN.match(query))
+
+
+def _text(value):
+    return value.decode() if isinstance(value, (bytes, bytearray)) else value
+
+
+class TableInfo:
+    def __init__(self, name, approx_rows, table_type):
+        self.name = name
+        # InnoDB's estimate from information_schema.TABLES, not an exact COUNT(*)
+        self.approx_rows = approx_rows
+        self.table_type = table_type
+        # (Field, Type, Null, Key, Default, Extra) in column order, the same shape DESCRIBE returns
+        self.columns = []
+        # index name -> {"columns": [...], "unique": bool}
+        self.indexes = {}
+
+    @property
+    def column_names(self):
+        return [column[0] for column in self.columns]
+
+    @property
+    def primary_key(self):
+        index = self.indexes.get("PRIMARY")
+        return list(index["columns"]) if index else []
+
+
+# Session cache of the schema of the connected database: tables, columns with their types and keys, indexes and
+# approximate row counts. It is filled with CATALOG_QUERY the first time it is needed and kept until invalidate(),
+# which SwiggyDBConnection calls after every DDL statement it runs.
+class SchemaCatalog:
+    def __init__(self):
+        self._tables = None
+        self._lock = threading.Lock()
+
+    # `fetch_all(query)` runs a query and returns its rows; `query` is the backend's equivalent of CATALOG_QUERY
+    def load(self, fetch_all, query=CATALOG_QUERY):
+        tables = {}
+        columns = []
+        indexes = []
+        for kind, table, *fields in fetch_all(query):
+            kind, table = _text(kind), _text(table)
+            if kind == "table":
+                approx_rows, table_type = fields[1], _text(fields[2])
+                tables[table] = TableInfo(table, int(approx_rows) if approx_rows is not None else None, table_type)
+            elif kind == "column":
+                columns.append((table, int(fields[1]), tuple(_text(value) for value in (fields[0], *fields[2:]))))
+            else:
+                indexes.append((table, int(fields[1]), _text(fields[2]), _text(fields[0]), int(fields[3])))
+        for table, _, description in sorted(columns, key=lambda column: column[:2]):
+            if table in tables:
+                tables[table].columns.append(description)
+        for table, _, index, column, non_unique in sorted(indexes, key=lambda index: index[:2]):
+            if table in tables:
+                entry = tables[table].indexes.setdefault(index, {"columns": [], "unique": not non_unique})
+                entry["columns"].append(column)
+        with self._lock:
+            self._tables = tables
+
+    def is_loaded(self):
+        with self._lock:
+            return self._tables is not None
+
+    def invalidate(self):
+        with self._lock:
+            self._tables = None
+
+    def table_names(self):
+        with self._lock:
+            return sorted(self._tables or ())
+
+    # TableInfo for `table_name` (matched case-insensitively as a fallback), or None if it does not exist
+    def table(self, table_name):
+        with self._lock:
+            tables = self._tables or {}
+            if table_name in tables:
+                return tables[table_name]
+            for name, info in tables.items():
+                if name.lower() == table_name.lower():
+                    return info
+            return None
@@ -0,0 +1,119 @@
+import os
+import re
+
+# Source file formats by file name suffix (checked in this order, so .csv.gz wins over .csv)
+SOURCE_FORMATS = (
+    (".csv.gz", "csv.gz"), (".gz", "csv.gz"),
+    (".csv.zst", "csv.zst"), (".zst", "csv.zst"),
+    (".parquet", "parquet"), (".pq", "parquet"),
+    (".arrow", "arrow"), (".feather", "arrow"), (".ipc", "arrow"),
+    (".csv", "csv"),
+)
+
+# Decompression pandas applies while streaming a compressed CSV
+_CSV_COMPRESSION = {"csv": None, "csv.gz": "gzip", "csv.zst": "zstd"}
+
+# Module each format needs beyond pandas, and the package providing it
+_REQUIREMENTS = {"csv.zst": ("zstandard", "zstandard"), "parquet": ("pyarrow", "pyarrow"), "arrow": ("pyarrow", "pyarrow")}
+
+
+def source_format(path):
+    name = os.fspath(path).lower()
+    for suffix, file_format in SOURCE_FORMATS:
+        if name.endswith(suffix):
+            return file_format
+    # Anything else is read as plain CSV, as load_from_csv always did
+    return "csv"
+
+
+def _require(file_format):
+    if file_format in _REQUIREMENTS:
+        module, package = _REQUIREMENTS[file_format]
+        try:
+            __import__(module)
+        except ImportError:
+            raise ImportError(f"Reading {file_format} sources needs {package}: pip install {package}")
+
+
+# Column name of a columnar file as a swiggy_source column name: "Average Cost for two" -> average_cost_for_two
+def _column_key(name):
+    return re.sub(r"\W+", "_", str(name).strip().lower()).strip("_")
+
+
+# Names of the file columns holding `columns` (swiggy_source names), matched case- and punctuation-insensitively so
+# files written with the source CSV header and files written with swiggy_source names both work
+def _project(file_columns, columns):
+    by_key = {}
+    for name in file_columns:
+        by_key.setdefault(_column_key(name), name)
+    missing = [column for column in columns if column not in by_key]
+    if missing:
+        raise ValueError(f"Source file has no column for {', '.join(missing)}; it has {', '.join(map(str, file_columns))}")
+    return [by_key[column] for column in columns]
+
+
+# DataFrames of at most chunk_size rows from a source file, with exactly `columns` (in that order) as column names.
+# CSV (plain, gzip or zstd) is streamed with latin1 decoding and positional columns, the way load_from_csv always
+# read it; compressed files are decompressed on the fly, never to disk. Parquet and Arrow IPC/Feather files are
+# read batch by batch with only the needed columns, found by name. With as_text=True CSV values are kept as the
+# strings in the file (only empty fields become missing), for validation to parse and to quarantine unchanged.
+def iter_source_frames(path, columns, chunk_size, as_text=False):
+    file_format = source_format(path)
+    _require(file_format)
+    if file_format in _CSV_COMPRESSION:
+        yield from _iter_csv(path, columns, chunk_size, _CSV_COMPRESSION[file_format], as_text)
+    elif file_format == "parquet":
+        yield from _iter_parquet(path, columns, chunk_size)
+    else:
+        yield from _iter_arrow(path, columns, chunk_size)
+
+
+def _iter_csv(path, columns, chunk_size, compression, as_text=False):
+    import pandas as pd
+    text_options = {"dtype": str, "keep_default_na": False, "na_values": [""]} if as_text else {}
+    reader = pd.read_csv(path, encoding='latin1', chunksize=chunk_size, compression=compression,
+                         usecols=range(len(columns)), **text_options)
+    with reader:
+        for chunk in reader:
+            chunk.columns = columns
+            yield chunk
+
+
+def _iter_parquet(path, columns, chunk_size):
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(path)
+    projected = _project(parquet_file.schema_arrow.names, columns)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=projected):
+        yield _batch_frame(batch, projected, columns)
+
+
+def _iter_arrow(path, columns, chunk_size):
+    import pyarrow as pa
+    with pa.memory_map(os.fspath(path), "r") as source:
+        try:
+            reader = pa.ipc.open_file(source)
+            batches = (reader.get_batch(index) for index in range(reader.num_record_batches))
+            names = reader.schema.names
+        except pa.ArrowInvalid:
+            # Streaming IPC format rather than the random-access file format
+            source.seek(0)
+            reader = pa.ipc.open_stream(source)
+            batches = iter(reader)
+            names = reader.schema.names
+        projected = _project(names, columns)
+        indexes = [names.index(name) for name in projected]
+        for batch in batches:
+            batch = batch.select(indexes)
+            for offset in range(0, batch.num_rows, chunk_size):
+                yield _batch_frame(batch.slice(offset, chunk_size), projected, columns)
+
+
+def _batch_frame(batch, projected, columns):
+    frame = batch.to_pandas()[projected]
+    frame.columns = columns
+    return frame
+
+
+# Whether the file can be handed to the server as-is (LOAD DATA LOCAL INFILE) or split into byte ranges
+def is_plain_csv(path):
+    return source_format(path) == "csv"
@@ -0,0 +1,174 @@
+import csv
+import os
+import time
+import numpy as np
+import pandas as pd
+from db.rollups import RATING_BANDS
+
+# Rating text of every star band of RATING_BANDS (the last band includes 5.0)
+RATING_TEXTS = ("Poor", "Average", "Good", "Very Good", "Excellent")
+
+# Longest value the swiggy_source text columns hold
+TEXT_LIMITS = {"restaurant_name": 255, "city": 100, "locality": 150, "cuisines": 100, "rating_in_text": 20}
+FLAG_COLUMNS = ("has_table_booking", "has_online_delivery")
+INTEGER_COLUMNS = ("average_cost_for_two", "price_range", "votes")
+PRICE_RANGES = (1, 2, 3, 4)
+
+# Rules checked on every source row, by name, in the order they are reported
+RULES = {
+    "missing_value": "a column is empty",
+    "not_a_number": "cost, rating, price range or votes is not a number",
+    "invalid_cost": "average cost for two is negative or fractional",
+    "rating_out_of_range": "rating stars outside 0-5",
+    "rating_text_mismatch": "rating text does not match the band of its stars",
+    "invalid_flag": "table booking / online delivery is not Yes or No",
+    "invalid_price_range": "price range is not 1-4",
+    "invalid_votes": "votes is negative or fractional",
+    "text_too_long": "a text value is longer than its column",
+}
+
+
+# Codes of every row (-1 when missing) and the stripped distinct values of a text column. Most source
+# columns repeat a few values many times, so the text rules and cleansing only look at the distinct values.
+def _distinct_text(column):
+    codes, uniques = pd.factorize(column)
+    values = [value.strip() if isinstance(value, str) else str(value) for value in uniques.tolist()]
+    return codes, values
+
+
+# Per-row values of a list with one value per distinct value; rows with a missing value (code -1) get `missing`
+def _per_row(codes, per_value, missing, dtype=object):
+    return np.array(per_value + [missing], dtype=dtype)[codes]
+
+
+# Numbers of a column read as text (or already numeric), parsed once per distinct value: (values, NaN where
+# missing or unparsable; missing mask, true for absent and blank values)
+def _distinct_numbers(column):
+    codes, uniques = pd.factorize(column)
+    uniques = uniques.tolist()
+    parsed = pd.to_numeric(pd.Series(uniques, dtype=object), errors="coerce").to_numpy(dtype=float).tolist()
+    blank = [isinstance(value, str) and value.strip() == "" for value in uniques]
+    return _per_row(codes, parsed, np.nan, float), _per_row(codes, blank, True, bool)
+
+
+# Star band (index into RATING_TEXTS) of every star value, -1 outside 0-5
+def _rating_band(stars):
+    bands = np.searchsorted(np.asarray(RATING_BANDS[1:-1]), stars, side="right")
+    return np.where((stars >= RATING_BANDS[0]) & (stars <= RATING_BANDS[-1]), bands, -1)
+
+
+# Checks a chunk of source rows (swiggy_source column names) with column-wise rules and cleanses the rows that pass:
+# text is stripped, Yes/No flags and rating texts get their canonical spelling, numbers are typed. Values may be the
+# raw strings of the file (see iter_source_frames as_text) or already typed. Returns the clean rows, a boolean frame
+# with one column per rule (RULES order) for every row, and the rejected mask.
+def validate_frame(frame):
+    rows = len(frame)
+    failed = {rule: np.zeros(rows, dtype=bool) for rule in RULES}
+    cleansed = {}
+    numbers = {}
+    for column in frame.columns:
+        if column in INTEGER_COLUMNS or column == "rating_stars_out_of_5":
+            numbers[column], missing = _distinct_numbers(frame[column])
+            failed["not_a_number"] |= np.isnan(numbers[column]) & ~missing
+            failed["missing_value"] |= missing
+            continue
+        codes, values = _distinct_text(frame[column])
+        failed["missing_value"] |= _per_row(codes, [value == "" for value in values], True, bool)
+        if column in TEXT_LIMITS:
+            failed["text_too_long"] |= _per_row(codes, [len(value) > TEXT_LIMITS[column] for value in values], False, bool)
+        if column in FLAG_COLUMNS:
+            failed["invalid_flag"] |= _per_row(codes, [value != "" and value.casefold() not in ("yes", "no") for value in values],
+                                               False, bool)
+            values = [value.capitalize() for value in values]
+        if column == "rating_in_text":
+            # Band of every rating text, -2 for an unknown text (never equal to a star band) and -1 when missing
+            bands = {text.casefold(): band for band, text in enumerate(RATING_TEXTS)}
+            text_bands = _per_row(codes, [bands.get(value.casefold(), -2) for value in values], -1, np.int64)
+        cleansed[column] = _per_row(codes, values, None)
+
+    cost, price_range, votes, stars = (numbers["average_cost_for_two"], numbers["price_range"], numbers["votes"],
+                                       numbers["rating_stars_out_of_5"])
+    with np.errstate(invalid="ignore"):
+        failed["invalid_cost"] = (cost < 0) | (cost % 1 != 0) & ~np.isnan(cost)
+        failed["invalid_votes"] = (votes < 0) | (votes % 1 != 0) & ~np.isnan(votes)
+        star_bands = _rating_band(stars)
+        failed["rating_out_of_range"] = (star_bands == -1) & ~np.isnan(stars)
+    failed["invalid_price_range"] = ~np.isin(price_range, PRICE_RANGES) & ~np.isnan(price_range)
+    failed["rating_text_mismatch"] = (star_bands != -1) & (text_bands != -1) & (star_bands != text_bands)
+
+    failed = pd.DataFrame(failed, index=frame.index)
+    rejected = failed.any(axis=1)
+    accepted = ~rejected.to_numpy()
+    clean = pd.DataFrame({column: cleansed[column][accepted] for column in cleansed}, index=frame.index[accepted])
+    clean["rating_in_text"] = np.asarray(RATING_TEXTS, dtype=object)[star_bands[accepted]]
+    for column in INTEGER_COLUMNS:
+        clean[column] = numbers[column][accepted].astype(np.int64)
+    clean["rating_stars_out_of_5"] = stars[accepted]
+    return clean[list(frame.columns)], failed, rejected
+
+
+# Rule names of every rejected row, as "rule;rule"
+def _rule_names(failed):
+    names = pd.Series("", index=failed.index, dtype=object)
+    for rule in failed.columns:
+        names = names.where(~failed[rule], names + rule + ";")
+    return names.str.rstrip(";")
+
+
+# Runs validate_frame over the chunks of one load, appends rejected rows to the quarantine CSV (their values as they
+# were read, the rules they broke, the source and their row number in it) and keeps per-rule rejection counts.
+class SourceValidator:
+    def __init__(self, quarantine_file=None):
+        self.quarantine_file = quarantine_file
+        self.checked = 0
+        self.rejected = 0
+        self.rule_counts = {rule: 0 for rule in RULES}
+        self.seconds = 0.0
+
+    # Clean rows of `frame`; `first_row` is the 1-based row number of its first row in `source`
+    def validate(self, frame, source, first_row):
+        start = time.perf_counter()
+        clean, failed, rejected = validate_frame(frame)
+        mask = rejected.to_numpy()
+        self.record(frame[mask], failed[mask], source, np.arange(first_row, first_row + len(frame))[mask])
+        self.checked += len(frame)
+        self.seconds += time.perf_counter() - start
+        return clean
+
+    # Counts and quarantines rows rejected elsewhere (e.g. by validate_frame in a parse worker)
+    def record(self, rejected_rows, failed, source, row_numbers, checked=0, seconds=0.0):
+        self.checked += checked
+        self.seconds += seconds
+        self.rejected += len(rejected_rows)
+        for rule, count in failed.sum().items():
+            self.rule_counts[rule] += int(count)
+        if self.quarantine_file and len(rejected_rows):
+            quarantined = rejected_rows.copy()
+            quarantined.insert(0, "rules", _rule_names(failed).to_numpy())
+            quarantined.insert(0, "row_number", row_numbers)
+            quarantined.insert(0, "source", str(source))
+            quarantined.insert(0, "rejected_at", time.strftime("%Y-%m-%d %H:%M:%S"))
+            new_file = not os.path.exists(self.quarantine_file) or os.path.getsize(self.quarantine_file) == 0
+            directory = os.path.dirname(self.quarantine_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            quarantined.to_csv(self.quarantine_file, mode="a", header=new_file, index=False, quoting=csv.QUOTE_MINIMAL)
+
+    def summary(self):
+        return {
+            "checked": self.checked,
+            "accepted": self.checked - self.rejected,
+            "rejected": self.rejected,
+            "rules": {rule: count for rule, count in self.rule_counts.items() if count},
+            "seconds": self.seconds,
+            "quarantine_file": self.quarantine_file if self.rejected else None,
+        }
+
+    def format_summary(self):
+        lines = [f"Validation: {self.checked} rows checked, {self.rejected} rejected in {self.seconds:.2f}s"]
+        for rule, count in self.rule_counts.items():
+            if count:
+                lines.append(f"  {rule}: {count} ({RULES[rule]})")
+        if self.rejected and self.quarantine_file:
+            lines.append(f"  rejected rows written to {self.quarantine_file}")
+        return "\n".join(lines)
@@ -0,0 +1,21 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from db.db_connection import SwiggyDBConnection
+
+SOURCE_CSV = os.path.join(ROOT, "data", "Swiggy_Analysis_Source_File.csv")
+
+
+# SQLite database in a temporary directory, built from the source CSV the way initialize_database does it
+@pytest.fixture
+def swiggy_db(tmp_path):
+    db = SwiggyDBConnection(None, None, None, str(tmp_path / "swiggy.db"), backend="sqlite")
+    db.create_tables()
+    db.load_from_csv(SOURCE_CSV)
+    db.initialize_other_tables()
+    yield db
+    db.disconnect()
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from db.analytics import AnalyticsEngine
+
+
+@pytest.fixture
+def engine(swiggy_db):
+    engine = AnalyticsEngine(swiggy_db)
+    yield engine
+    engine.close()
+
+
+FACTS = """
+FROM fact_swiggy f
+JOIN city c ON f.city_id = c.id
+JOIN cuisines cu ON f.cuisine_id = cu.id
+JOIN ratings ra ON f.rating_id = ra.id
+"""
+
+
+def test_group_by_city_count_matches_sql(engine, swiggy_db):
+    expected = {name: count for name, count in swiggy_db.fetch_query_result(f"SELECT c.name, COUNT(*) {FACTS} GROUP BY c.name")}
+    assert {city: value for city, value, _ in engine.group_by("city", agg="count")} == expected
+
+
+def test_group_by_text_attribute_matches_sql(engine, swiggy_db):
+    rows = swiggy_db.fetch_query_result(f"SELECT ra.text, AVG(f.votes), COUNT(*) {FACTS} GROUP BY ra.text")
+    expected = {text: (pytest.approx(mean), count) for text, mean, count in rows}
+    assert {text: (value, count) for text, value, count in engine.group_by("ratings.text", "votes", "mean")} == expected
+
+
+def test_filter_on_text_attribute_matches_sql(engine, swiggy_db):
+    rows = swiggy_db.fetch_query_result(f"SELECT c.name, SUM(f.votes) {FACTS} WHERE ra.text = 'Very Good' GROUP BY c.name")
+    groups = engine.group_by("city", "votes", "sum", where={"ratings.text": "very good"})
+    assert {city: value for city, value, _ in groups} == {name: total for name, total in rows}
+
+
+def test_top_k_by_text_attribute_matches_sql(engine, swiggy_db):
+    rows = swiggy_db.fetch_query_result(f"SELECT ra.text, SUM(f.votes) AS total {FACTS} GROUP BY ra.text ORDER BY total DESC LIMIT 2")
+    assert [(text, value) for text, value, _ in engine.top_k("ratings.text", "votes", k=2)] == [tuple(row) for row in rows]
+
+
+def test_top_k_cuisines_matches_sql(engine, swiggy_db):
+    rows = swiggy_db.fetch_query_result(f"SELECT cu.name, SUM(f.avg_cost_for_two) AS total {FACTS} GROUP BY cu.name ORDER BY total DESC LIMIT 5")
+    assert [(name, value) for name, value, _ in engine.top_k("cuisine", "avg_cost_for_two", k=5)] == [tuple(row) for row in rows]
+
+
+def test_histogram_by_text_attribute_matches_sql(engine, swiggy_db):
+    rows = swiggy_db.fetch_query_result(f"SELECT ra.text, f.avg_cost_for_two {FACTS}")
+    costs = np.array([cost for _, cost in rows], dtype=float)
+    edges, counts = engine.histogram("avg_cost_for_two", bins=5)
+    assert edges == pytest.approx(np.histogram_bin_edges(costs, bins=5).tolist())
+    assert counts == np.histogram(costs, bins=edges)[0].tolist()
+    _, by_text = engine.histogram("avg_cost_for_two", bins=5, by="ratings.text")
+    for text, text_counts in by_text.items():
+        assert text_counts == np.histogram([cost for t, cost in rows if t == text], bins=edges)[0].tolist()
+    assert sum(map(sum, by_text.values())) == len(rows)
+
+
+def test_text_attribute_is_not_a_measure(engine):
+    with pytest.raises(ValueError, match="not numeric"):
+        engine.group_by("city", "ratings.text", "sum")
@@ -0,0 +1,37 @@
+import asyncio
+from db.async_db_connection import AsyncSwiggyDBConnection
+from conftest import SOURCE_CSV
+
+
+def test_async_ingest_paths(tmp_path):
+    async def run():
+        db = await AsyncSwiggyDBConnection.connect(None, None, None, str(tmp_path / "swiggy.db"), backend="sqlite")
+        async with db:
+            await db.create_tables()
+            encoded = await db.load_dictionary_encoded(SOURCE_CSV, chunk_size=100, validate=True)
+            parallel = await db.load_from_csv_parallel(SOURCE_CSV, workers=1, loaders=1, validate=False)
+            source_rows = await db.fetch_query_result("SELECT COUNT(*) FROM swiggy_source")
+        return encoded, parallel, source_rows
+
+    encoded, parallel, source_rows = asyncio.run(run())
+    assert encoded["rows"] == encoded["validation"]["accepted"] > 0
+    assert "validation" not in parallel
+    assert source_rows == [(parallel["rows"],)]
+
+
+def test_async_single_row_inserts(swiggy_db):
+    async def run():
+        db = AsyncSwiggyDBConnection(swiggy_db)
+        await db.insert_into_city_table("Atlantis")
+        await db.insert_into_restaurants_table("Deep Dish")
+        await db.insert_into_cuisines_table("Seafood Fusion")
+        await db.insert_into_locality_table("Coral Reef")
+        await db.insert_into_ratings_table(0.5, "Poor")
+        await db.insert_into_fact_swiggy_table(900, 12, 2, city="Atlantis", locality="Coral Reef", restaurant_name="Deep Dish",
+                                               cuisines="Seafood Fusion", rating_stars_out_of_5=0.5, rating_in_text="Poor",
+                                               has_online_delivery="Yes", has_table_booking="No")
+        return await db.fetch_query_result(
+            "SELECT c.name, r.name, f.avg_cost_for_two, f.votes FROM fact_swiggy f "
+            "JOIN city c ON f.city_id = c.id JOIN restaurants r ON f.rest_id = r.id WHERE c.name = 'Atlantis'")
+
+    assert asyncio.run(run()) == [("Atlantis", "Deep Dish", 900, 12)]
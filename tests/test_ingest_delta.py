@@ -0,0 +1,45 @@
+import csv
+from db.db_connection import SwiggyDBConnection
+from conftest import SOURCE_CSV
+
+
+def _source_rows():
+    with open(SOURCE_CSV, encoding="latin1", newline="") as f:
+        return list(csv.reader(f))
+
+
+def _write(path, rows):
+    with open(path, "w", encoding="latin1", newline="") as f:
+        csv.writer(f).writerows(rows)
+
+
+def test_delta_of_unchanged_feed_only_backfills_hashes(tmp_path):
+    # One pooled connection: the backfill scan and its updates must share it
+    db = SwiggyDBConnection(None, None, None, str(tmp_path / "swiggy.db"), backend="sqlite", pool_size=1, checkout_timeout=5)
+    try:
+        db.create_tables()
+        db.load_from_csv(SOURCE_CSV)
+        db.initialize_other_tables()
+        facts = db.fetch_query_result("SELECT COUNT(*) FROM fact_swiggy")[0][0]
+        hits = db.query_cache.hits
+        stats = db.ingest_delta(SOURCE_CSV, chunk_size=50)
+        assert stats["backfilled_hashes"] == facts
+        assert (stats["new_rows"], stats["deleted_rows"], stats["unchanged_rows"]) == (0, 0, facts)
+        assert db.query_cache.hits == hits
+        assert db.fetch_query_result("SELECT COUNT(*) FROM fact_swiggy WHERE source_hash IS NULL") == [(0,)]
+    finally:
+        db.disconnect()
+
+
+def test_delta_appends_changed_rows_and_prunes_removed_ones(swiggy_db, tmp_path):
+    header, *rows = _source_rows()
+    swiggy_db.ingest_delta(SOURCE_CSV)
+    changed = list(rows[0])
+    changed[10] = str(int(changed[10]) + 1)
+    feed = tmp_path / "feed.csv"
+    _write(feed, [header, changed] + rows[2:])
+    stats = swiggy_db.ingest_delta(str(feed))
+    assert (stats["new_rows"], stats["deleted_rows"]) == (1, 2)
+    assert swiggy_db.fetch_query_result("SELECT COUNT(*) FROM fact_swiggy") == [(len(rows) - 1,)]
+    assert swiggy_db.fetch_query_result("SELECT SUM(votes) FROM fact_swiggy") == [
+        (sum(int(row[10]) for row in rows[2:]) + int(changed[10]),)]
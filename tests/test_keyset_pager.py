@@ -0,0 +1,19 @@
+from db.keyset_pager import KeysetPager
+
+
+def test_seek_query_without_columns_qualifies_star():
+    pager = KeysetPager(None, "fact_swiggy", "fact_id", page_size=10)
+    query, params = pager._seek_query(after_key=20)
+    assert query == "SELECT fact_id, fact_swiggy.* FROM fact_swiggy WHERE fact_id > %s ORDER BY fact_id ASC LIMIT 11"
+    assert params == (20,)
+
+
+def test_pages_match_offset_pagination(swiggy_db):
+    pager = swiggy_db.keyset_pager("fact_swiggy", page_size=50)
+    all_rows = swiggy_db.fetch_query_result("SELECT * FROM fact_swiggy ORDER BY fact_id")
+    pages = [pager.first_page()]
+    while pager.has_next:
+        pages.append(pager.next_page())
+    assert [row for page in pages for row in page] == all_rows
+    assert pager.result_columns == swiggy_db.fetch_table_columns("fact_swiggy")
+    assert pager.previous_page() == pages[-2]
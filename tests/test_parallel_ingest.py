@@ -0,0 +1,28 @@
+import threading
+from contextlib import contextmanager
+from db.db_connection import SOURCE_COLUMNS, SOURCE_TYPES
+from db.parallel_ingest import parallel_load
+from conftest import SOURCE_CSV
+
+
+def test_loader_checkout_failure_raises_instead_of_hanging(swiggy_db):
+    @contextmanager
+    def no_connection(**kwargs):
+        raise RuntimeError("pool exhausted")
+        yield
+
+    swiggy_db._cursor = no_connection
+    query = f"INSERT INTO swiggy_source ({', '.join(SOURCE_COLUMNS)}) VALUES ({', '.join(['%s'] * len(SOURCE_COLUMNS))})"
+    outcome = {}
+
+    def run():
+        try:
+            parallel_load(swiggy_db, [SOURCE_CSV], query, SOURCE_COLUMNS, SOURCE_TYPES, workers=1, loaders=1, range_bytes=1000)
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=60)
+    assert not thread.is_alive(), "parallel_load hung after its loader failed"
+    assert str(outcome["error"]) == "pool exhausted"
@@ -0,0 +1,24 @@
+def _read(stream):
+    with stream:
+        return stream.columns, [row for rows in stream.batches() for row in rows]
+
+
+def test_streamed_query_is_served_from_cache_on_rerun(swiggy_db):
+    query = "SELECT name FROM city ORDER BY name"
+    hits = swiggy_db.query_cache.hits
+    first = _read(swiggy_db.iter_query_result(query, batch_size=2))
+    assert swiggy_db.query_cache.hits == hits
+    second = _read(swiggy_db.iter_query_result(query, batch_size=2))
+    assert swiggy_db.query_cache.hits == hits + 1
+    assert second == first
+    assert first[1] == swiggy_db.fetch_query_result(query)
+
+
+def test_partly_read_stream_is_not_cached(swiggy_db):
+    query = "SELECT name FROM restaurants ORDER BY name"
+    stream = swiggy_db.iter_query_result(query, batch_size=10)
+    next(stream)
+    stream.close()
+    hits = swiggy_db.query_cache.hits
+    assert len(_read(swiggy_db.iter_query_result(query))[1]) > 1
+    assert swiggy_db.query_cache.hits == hits
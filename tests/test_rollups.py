@@ -0,0 +1,62 @@
+import sqlite3
+from db.rollups import rewrite_for_rollup
+
+
+def test_routed_count_matching_no_group_is_zero(swiggy_db):
+    query = "SELECT COUNT(*) FROM fact_swiggy WHERE price_range = 9"
+    assert rewrite_for_rollup(query) is not None
+    routed = swiggy_db.rollups.routed_queries
+    assert swiggy_db.fetch_query_result(query) == [(0,)]
+    assert swiggy_db.rollups.routed_queries == routed + 1
+
+
+# Facts changed through another connection, which the DB layer never sees writing
+def _external_write(db, statement):
+    connection = sqlite3.connect(db.database)
+    with connection:
+        connection.execute(statement)
+    connection.close()
+
+
+def _fact_count(db, where=""):
+    connection = sqlite3.connect(db.database)
+    count = connection.execute(f"SELECT COUNT(*) FROM fact_swiggy {where}").fetchone()[0]
+    connection.close()
+    return count
+
+
+def test_routed_count_sees_facts_deleted_by_another_connection(swiggy_db):
+    query = "SELECT COUNT(*) FROM fact_swiggy"
+    assert swiggy_db.fetch_query_result(query) == [(_fact_count(swiggy_db),)]
+    _external_write(swiggy_db, "DELETE FROM fact_swiggy WHERE price_range = 2")
+    # Deletions below the newest fact only show in the periodic full check
+    swiggy_db.rollups.check_interval = 0
+    assert swiggy_db.fetch_query_result(query) == [(_fact_count(swiggy_db),)]
+
+
+def test_routed_count_sees_newest_facts_deleted_by_another_connection(swiggy_db):
+    query = "SELECT COUNT(*) FROM fact_swiggy"
+    swiggy_db.fetch_query_result(query)
+    _external_write(swiggy_db, "DELETE FROM fact_swiggy WHERE fact_id > 200")
+    assert swiggy_db.fetch_query_result(query) == [(_fact_count(swiggy_db),)]
+
+
+def test_routed_queries_do_not_count_facts_between_full_checks(swiggy_db):
+    checks = []
+    check_facts = swiggy_db.rollups._check_facts
+    swiggy_db.rollups._check_facts = lambda full: checks.append(full) or check_facts(full)
+    for price_range in (1, 2, 3):
+        swiggy_db.fetch_query_result(f"SELECT COUNT(*) FROM fact_swiggy WHERE price_range = {price_range}")
+    assert checks == [False, False, False]
+
+
+def test_routed_count_sees_facts_appended_by_another_connection(swiggy_db):
+    query = "SELECT price_range, COUNT(*) FROM fact_swiggy GROUP BY price_range"
+    swiggy_db.fetch_query_result(query)
+    _external_write(swiggy_db, """
+    INSERT INTO fact_swiggy (city_id, locality_id, rest_id, cuisine_id, rating_id, delivery_id, booking_id, avg_cost_for_two, votes, price_range)
+    SELECT city_id, locality_id, rest_id, cuisine_id, rating_id, delivery_id, booking_id, avg_cost_for_two, votes, price_range
+    FROM fact_swiggy WHERE price_range = 4
+    """)
+    expected = {price_range: _fact_count(swiggy_db, f"WHERE price_range = {price_range}") for price_range in (1, 2, 3, 4)}
+    assert dict(swiggy_db.fetch_query_result(query)) == expected
@@ -0,0 +1,96 @@
+import csv
+from db.db_connection import SwiggyDBConnection
+from conftest import SOURCE_CSV
+
+
+def _source_rows():
+    with open(SOURCE_CSV, encoding="latin1", newline="") as f:
+        return list(csv.reader(f))
+
+
+def _write(path, rows):
+    with open(path, "w", encoding="latin1", newline="") as f:
+        csv.writer(f).writerows(rows)
+
+
+def _database(tmp_path, name):
+    db = SwiggyDBConnection(None, None, None, str(tmp_path / f"{name}.db"), backend="sqlite",
+                            quarantine_file=str(tmp_path / f"{name}_rejected.csv"))
+    db.create_tables()
+    return db
+
+
+# Source feed with one row breaking each rule, one padded number and one flag that only needs cleansing
+def _bad_feed(tmp_path):
+    header, *rows = _source_rows()
+    rows = [list(row) for row in rows]
+    rows[0][4] = ""             # missing_value
+    rows[1][4] = "abc"          # not_a_number
+    rows[2][7] = "6.0"          # rating_out_of_range
+    rows[3][8] = "Poor"         # rating_text_mismatch (4.8 stars)
+    rows[4][5] = "Y"            # invalid_flag
+    rows[5][9] = "9"            # invalid_price_range
+    rows[6][10] = "-3"          # invalid_votes
+    rows[7][0] = "x" * 300      # text_too_long
+    rows[8][4] = " 1500 "       # accepted, parsed as 1500
+    rows[9][6] = " yes "        # accepted, cleansed to Yes
+    feed = tmp_path / "feed.csv"
+    _write(feed, [header] + rows)
+    return feed, rows
+
+
+def test_rejected_rows_are_counted_and_quarantined_as_source_text(tmp_path):
+    feed, rows = _bad_feed(tmp_path)
+    db = _database(tmp_path, "serial")
+    try:
+        summary = db.load_from_csv(str(feed), chunk_size=100)["validation"]
+        assert (summary["checked"], summary["rejected"]) == (len(rows), 8)
+        assert summary["rules"] == {"missing_value": 1, "not_a_number": 1, "rating_out_of_range": 1,
+                                    "rating_text_mismatch": 1, "invalid_flag": 1, "invalid_price_range": 1,
+                                    "invalid_votes": 1, "text_too_long": 1}
+        with open(summary["quarantine_file"], encoding="latin1", newline="") as f:
+            quarantined = list(csv.reader(f))[1:]
+        # rejected_at, source, row_number, rules, then the row exactly as it is in the file
+        assert [row[2] for row in quarantined] == [str(number) for number in range(1, 9)]
+        assert [row[4:] for row in quarantined] == rows[:8]
+        loaded = {row[0]: row for row in db.fetch_query_result("SELECT * FROM swiggy_source")}
+        assert loaded[rows[8][0]][4] == 1500
+        assert loaded[rows[9][0]][6] == "Yes"
+    finally:
+        db.disconnect()
+
+
+def test_validated_load_of_clean_source_matches_unvalidated_load(tmp_path):
+    validated = _database(tmp_path, "validated")
+    plain = _database(tmp_path, "plain")
+    try:
+        assert validated.load_from_csv(SOURCE_CSV)["validation"]["rejected"] == 0
+        plain.load_from_csv(SOURCE_CSV, validate=False)
+        # Validation only strips the padding some source values carry
+        query = "SELECT * FROM swiggy_source"
+        stripped = [tuple(value.strip() if isinstance(value, str) else value for value in row)
+                    for row in plain.fetch_query_result(query)]
+        assert sorted(validated.fetch_query_result(query)) == sorted(stripped)
+    finally:
+        validated.disconnect()
+        plain.disconnect()
+
+
+def test_parallel_load_validates_like_serial_load(tmp_path):
+    feed, _ = _bad_feed(tmp_path)
+    serial = _database(tmp_path, "serial")
+    parallel = _database(tmp_path, "parallel")
+    try:
+        serial_summary = serial.load_from_csv(str(feed))["validation"]
+        parallel_summary = parallel.load_from_csv_parallel(str(feed), workers=1, range_bytes=5000)["validation"]
+        assert parallel_summary["rules"] == serial_summary["rules"]
+        query = "SELECT * FROM swiggy_source"
+        assert sorted(parallel.fetch_query_result(query)) == sorted(serial.fetch_query_result(query))
+        with open(serial_summary["quarantine_file"], encoding="latin1") as f:
+            serial_rows = sorted(line.split(",", 2)[2] for line in f.read().splitlines()[1:])
+        with open(parallel_summary["quarantine_file"], encoding="latin1") as f:
+            parallel_rows = sorted(line.split(",", 2)[2] for line in f.read().splitlines()[1:])
+        assert parallel_rows == serial_rows
+    finally:
+        serial.disconnect()
+        parallel.disconnect()
@@ -0,0 +1,233 @@
+import argparse
+import gzip
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+DEFAULT_SOURCE_CSV = os.path.join("data", "Swiggy_Analysis_Source_File.csv")
+DEFAULT_SEED = 42
+DEFAULT_CHUNK_SIZE = 100000
+
+# Distinct restaurants in a generated dataset: one per RESTAURANT_ROW_RATIO rows (never fewer than the source has),
+# capped so the restaurants dimension stays realistic at 100M rows
+RESTAURANT_ROW_RATIO = 10
+MAX_RESTAURANTS = 1000000
+
+# Spread of the multiplicative noise put on sampled votes and costs, so large datasets are not just copies of the
+# few hundred source values
+VOTES_NOISE = 0.35
+COST_NOISE = 0.15
+# Costs are rounded to this step, like the source
+COST_STEP = 50
+
+
+def _distribution(series):
+    counts = series.value_counts(sort=False)
+    return counts.index.to_numpy(), (counts / counts.sum()).to_numpy()
+
+
+# Column distributions and value sets of the source CSV. Columns are read by position, in the swiggy_source order
+# (restaurant_name, city, locality, cuisines, average_cost_for_two, has_table_booking, has_online_delivery,
+# rating_stars_out_of_5, rating_in_text, price_range, votes), and the source header is kept for the output.
+#
+# Learned: city frequencies, locality per city, cuisine frequencies, the rating star distribution and the rating
+# text band of every star value, price range frequencies, and per price range the cost values, the vote counts
+# and the share of restaurants with table booking / online delivery.
+class SourceProfile:
+    def __init__(self, frame):
+        frame = frame.dropna()
+        self.header = list(frame.columns)
+        (name, city, locality, cuisines, cost, booking, delivery, stars, text, price_range, votes) = self.header
+        self.restaurant_names = frame[name].drop_duplicates().to_numpy()
+        self.cities, self.city_p = _distribution(frame[city])
+        self.localities = {value: _distribution(group[locality]) for value, group in frame.groupby(city)}
+        self.cuisines, self.cuisine_p = _distribution(frame[cuisines])
+        self.stars, self.star_p = _distribution(frame[stars])
+        # Most common text of every star value (the bands do not overlap in the source)
+        self.star_text = frame.groupby(stars)[text].agg(lambda values: values.value_counts().index[0]).to_dict()
+        self.price_ranges, self.price_range_p = _distribution(frame[price_range])
+        self.costs, self.votes, self.booking_yes, self.delivery_yes = {}, {}, {}, {}
+        for value, group in frame.groupby(price_range):
+            self.costs[value] = (group[cost].to_numpy(), group[cost].min(), group[cost].max())
+            self.votes[value] = group[votes].to_numpy()
+            self.booking_yes[value] = (group[booking] == "Yes").mean()
+            self.delivery_yes[value] = (group[delivery] == "Yes").mean()
+
+    @classmethod
+    def from_csv(cls, csv_file_path=DEFAULT_SOURCE_CSV):
+        return cls(pd.read_csv(csv_file_path, encoding="latin1"))
+
+    # Restaurant name of every index: the source names first, then numbered branches of them
+    def restaurant_name(self, indexes):
+        base = len(self.restaurant_names)
+        names = self.restaurant_names[indexes % base]
+        branches = indexes // base
+        return np.where(branches == 0, names, [f"{name} #{branch + 1}" for name, branch in zip(names, branches)])
+
+    # `rows` synthetic source rows drawn with `rng`, as a DataFrame with the source header
+    def sample(self, rng, rows, restaurants):
+        city = self.cities[rng.choice(len(self.cities), rows, p=self.city_p)]
+        locality = np.empty(rows, dtype=object)
+        for value in self.cities:
+            mask = city == value
+            values, p = self.localities[value]
+            locality[mask] = values[rng.choice(len(values), int(mask.sum()), p=p)]
+        price_range = self.price_ranges[rng.choice(len(self.price_ranges), rows, p=self.price_range_p)]
+        cost = np.empty(rows, dtype=np.int64)
+        votes = np.empty(rows, dtype=np.int64)
+        booking = np.empty(rows, dtype=object)
+        delivery = np.empty(rows, dtype=object)
+        for value in self.price_ranges:
+            mask = price_range == value
+            count = int(mask.sum())
+            values, low, high = self.costs[value]
+            noisy = values[rng.integers(0, len(values), count)] * rng.lognormal(0.0, COST_NOISE, count)
+            cost[mask] = np.clip(np.round(noisy / COST_STEP) * COST_STEP, low, high)
+            sampled_votes = self.votes[value][rng.integers(0, len(self.votes[value]), count)]
+            votes[mask] = np.round(sampled_votes * rng.lognormal(0.0, VOTES_NOISE, count))
+            booking[mask] = np.where(rng.random(count) < self.booking_yes[value], "Yes", "No")
+            delivery[mask] = np.where(rng.random(count) < self.delivery_yes[value], "Yes", "No")
+        stars = self.stars[rng.choice(len(self.stars), rows, p=self.star_p)]
+        text = np.array([self.star_text[star] for star in stars], dtype=object)
+        return pd.DataFrame(dict(zip(self.header, (
+            self.restaurant_name(rng.integers(0, restaurants, rows)), city, locality,
+            self.cuisines[rng.choice(len(self.cuisines), rows, p=self.cuisine_p)], cost, booking, delivery, stars,
+            text, price_range, votes,
+        ))))
+
+
+def default_restaurant_count(profile, rows):
+    return max(len(profile.restaurant_names), min(rows // RESTAURANT_ROW_RATIO, MAX_RESTAURANTS))
+
+
+# DataFrames of at most `chunk_size` rows adding up to `rows`. Chunk i is drawn from a generator seeded with
+# (seed, i), so the same seed and chunk size always give the same data, and memory does not grow with `rows`.
+def iter_chunks(rows, seed=DEFAULT_SEED, chunk_size=DEFAULT_CHUNK_SIZE, profile=None, restaurants=None):
+    profile = profile or SourceProfile.from_csv()
+    restaurants = restaurants or default_restaurant_count(profile, rows)
+    for index, start in enumerate(range(0, rows, chunk_size)):
+        rng = np.random.default_rng(np.random.SeedSequence([seed, index]))
+        yield profile.sample(rng, min(chunk_size, rows - start), restaurants)
+
+
+def _output_format(path, file_format):
+    if file_format:
+        return file_format
+    return "parquet" if path.endswith(".parquet") else "csv"
+
+
+# Path of part `number` when the output is split into several files: data.csv -> data-00001.csv
+def _part_path(path, number):
+    for suffix in (".csv.gz", ".csv", ".parquet"):
+        if path.endswith(suffix):
+            return f"{path[:-len(suffix)]}-{number:05d}{suffix}"
+    return f"{path}-{number:05d}"
+
+
+# Writes one output file chunk by chunk: CSV (gzip-compressed when the path ends in .gz) or Parquet, one row
+# group per chunk. Parquet needs pyarrow.
+class _ChunkWriter:
+    def __init__(self, path, file_format):
+        self.path = path
+        self.file_format = file_format
+        self._parquet = None
+        self._header = True
+        if file_format == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ImportError("Parquet output needs pyarrow: pip install pyarrow")
+            self._handle = None
+        elif path.endswith(".gz"):
+            # Same encoding the loaders read the source CSV with
+            self._handle = gzip.open(path, "wt", encoding="latin1", newline="")
+        else:
+            self._handle = open(path, "w", encoding="latin1", newline="")
+
+    def write(self, frame):
+        if self.file_format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            frame.to_csv(self._handle, header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+        if self._handle is not None:
+            self._handle.close()
+
+
+# Generate `rows` synthetic rows into `output_path` (split into parts of rows_per_file rows when given).
+# Returns the files written and the throughput.
+def generate(output_path, rows, seed=DEFAULT_SEED, chunk_size=DEFAULT_CHUNK_SIZE, file_format=None, rows_per_file=None,
+             source_csv=DEFAULT_SOURCE_CSV, restaurants=None, progress=None):
+    file_format = _output_format(output_path, file_format)
+    profile = SourceProfile.from_csv(source_csv)
+    restaurants = restaurants or default_restaurant_count(profile, rows)
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    start = time.perf_counter()
+    files = []
+    writer = None
+    written = in_file = 0
+    try:
+        for chunk in iter_chunks(rows, seed, chunk_size, profile, restaurants):
+            # A chunk is sliced across part boundaries, so the data does not depend on rows_per_file
+            while len(chunk):
+                if writer is None or (rows_per_file and in_file >= rows_per_file):
+                    if writer is not None:
+                        writer.close()
+                    path = _part_path(output_path, len(files) + 1) if rows_per_file else output_path
+                    writer = _ChunkWriter(path, file_format)
+                    files.append(path)
+                    in_file = 0
+                part = chunk.iloc[:rows_per_file - in_file] if rows_per_file else chunk
+                chunk = chunk.iloc[len(part):]
+                writer.write(part)
+                written += len(part)
+                in_file += len(part)
+            if progress:
+                progress(written, rows, time.perf_counter() - start)
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - start
+    return {"rows": written, "files": files, "format": file_format, "seed": seed, "restaurants": restaurants,
+            "seconds": elapsed, "rows_per_sec": written / elapsed if elapsed > 0 else float(written)}
+
+
+def _print_progress(written, rows, elapsed):
+    print(f"\r{written:,}/{rows:,} rows ({written / elapsed if elapsed > 0 else 0:,.0f} rows/sec)", end="", file=sys.stderr)
+    if written == rows:
+        print(file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Swiggy dataset shaped like the source CSV.")
+    parser.add_argument("output", help="output file (.csv, .csv.gz or .parquet)")
+    parser.add_argument("--rows", type=int, required=True, help="number of rows to generate")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows generated and written at a time")
+    parser.add_argument("--format", choices=("csv", "parquet"), help="default: from the output extension")
+    parser.add_argument("--rows-per-file", type=int, help="split the output into numbered parts of this many rows")
+    parser.add_argument("--source", default=DEFAULT_SOURCE_CSV, help="CSV the distributions are learned from")
+    parser.add_argument("--restaurants", type=int, help="distinct restaurant names (default: rows / 10, at most 1M)")
+    args = parser.parse_args(argv)
+    stats = generate(args.output, args.rows, seed=args.seed, chunk_size=args.chunk_size, file_format=args.format,
+                     rows_per_file=args.rows_per_file, source_csv=args.source, restaurants=args.restaurants,
+                     progress=_print_progress)
+    print(f"Wrote {stats['rows']:,} rows to {len(stats['files'])} {stats['format']} file(s) in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/sec, seed {stats['seed']})")
+
+
+if __name__ == "__main__":
+    main()